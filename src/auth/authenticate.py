@@ -1,11 +1,46 @@
+import os
+from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import TTLCache
 from .jwt_handler import verify_access_token
+from database.connection import get_session
+from models.users import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/users/signin')
 
-def authenticate(token: str = Depends(oauth2_scheme)) -> str:
+principal_cache = TTLCache(maxsize=int(os.getenv('PRINCIPAL_CACHE_SIZE', 10000)),
+                           ttl=float(os.getenv('PRINCIPAL_CACHE_TTL', 30)))
+
+class Principal(BaseModel):
+    id: UUID
+    username: str
+    is_active: bool
+
+async def resolve_principal(session: AsyncSession, username: str) -> Principal:
+    principal = principal_cache.get(username)
+    if principal is None:
+        result = await session.execute(select(User.id, User.is_active).where(User.username == username))
+        row = result.first()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Sign in for access')
+        principal = Principal(id=row.id, username=username, is_active=row.is_active)
+        principal_cache.set(username, principal)
+    return principal
+
+async def authenticate(token: str = Depends(oauth2_scheme),
+                       session: AsyncSession = Depends(get_session)) -> Principal:
     if not token:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Sign in for access')
     decoded_token = verify_access_token(token)
-    return decoded_token['user']
\ No newline at end of file
+    if 'id' in decoded_token:
+        principal = Principal(id=decoded_token['id'], username=decoded_token['user'],
+                              is_active=decoded_token.get('is_active', True))
+    else:
+        principal = await resolve_principal(session, decoded_token['user'])
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='User is inactive')
+    return principal
@@ -1,10 +1,76 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from metrics import bcrypt_queue, bcrypt_duration
 
 pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
 
+BCRYPT_POOL: str = os.getenv('BCRYPT_POOL', 'thread')
+BCRYPT_WORKERS: int = int(os.getenv('BCRYPT_WORKERS', os.cpu_count() or 1))
+BCRYPT_MAX_PENDING: int = int(os.getenv('BCRYPT_MAX_PENDING', 64))
+
+_executor: Optional[Executor] = None
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def _timed(func: Callable, *args: str) -> Tuple[float, float, Any]:
+    started = time.time()
+    result = func(*args)
+    return started, time.time(), result
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if BCRYPT_POOL == 'process':
+            _executor = ProcessPoolExecutor(max_workers=BCRYPT_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix='bcrypt')
+    return _executor
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
 class HashPassword:
-    def create_hash(self, password: str) -> CryptContext:
-        return pwd_context.hash(password)
+    def __init__(self, max_pending: int = BCRYPT_MAX_PENDING) -> None:
+        self.max_pending = max_pending
+        self.pending = 0
+
+    def create_hash(self, password: str) -> str:
+        return _hash(password)
+
+    def verify_hash(self, plain_password: str, hashed_password: str) -> bool:
+        return _verify(plain_password, hashed_password)
+
+    async def acreate_hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def averify_hash(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, plain_password, hashed_password)
 
-    def verify_hash(self, plain_password: str, hashed_password: str) -> CryptContext:
-        return pwd_context.verify(plain_password, hashed_password)
+    async def _run(self, func: Callable, *args: str):
+        if self.pending >= self.max_pending:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail='Too many sign in attempts in progress, try again later',
+                                headers={'Retry-After': '1'})
+        self.pending += 1
+        submitted = time.time()
+        try:
+            started, finished, result = await asyncio.get_running_loop().run_in_executor(
+                get_executor(), _timed, func, *args)
+        finally:
+            self.pending -= 1
+        operation = func.__name__.lstrip('_')
+        bcrypt_queue.observe(max(started - submitted, 0), operation)
+        bcrypt_duration.observe(finished - started, operation)
+        return result
@@ -1,18 +1,33 @@
+import hashlib
+import os
 import time
 from datetime import datetime
+from uuid import UUID
 from fastapi import HTTPException, status
 from jose import jwt, JWTError
 from database.connection import SECRET_KEY
+from .cache import TTLCache
 
-def create_access_token(user: str) -> str:
+token_cache = TTLCache(maxsize=int(os.getenv('TOKEN_CACHE_SIZE', 10000)), ttl=3600)
+
+def create_access_token(user: str, user_id: UUID, is_active: bool = True) -> str:
     payload = {
         'user': user,
+        'id': str(user_id),
+        'is_active': is_active,
         'expires': time.time() + 3600
     }
     token = jwt.encode(payload, SECRET_KEY, algorithm='HS256')
     return token
 
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
 def verify_access_token(token: str) -> dict:
+    key = _token_key(token)
+    data = token_cache.get(key)
+    if data is not None:
+        return data
     try:
         data = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
         expire = data.get('expires')
@@ -20,7 +35,13 @@ def verify_access_token(token: str) -> dict:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='No access token supplied')
         if datetime.utcnow() > datetime.fromtimestamp(expire):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Token expired!')
+        token_cache.set(key, data, expires=expire)
         return data
     except JWTError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid token')
 
+def invalidate_access_token(token: str) -> None:
+    token_cache.pop(_token_key(token))
+
+def clear_token_cache() -> None:
+    token_cache.clear()
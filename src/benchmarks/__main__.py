@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Drive the API in-process against a freshly seeded database.')
+    parser.add_argument('scenarios', nargs='*', help='scenarios to run, all of them by default')
+    parser.add_argument('--database', default='benchmark',
+                        help='database to drop, recreate and seed (never point this at real data)')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--channel-ratio', type=float, default=0.2)
+    parser.add_argument('--posts-per-channel', type=int, default=20)
+    parser.add_argument('--follows-per-user', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--output', help='write the report as JSON to this path')
+    parser.add_argument('--baseline', help='compare against a JSON report and fail on regression')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed relative slowdown before a result counts as a regression')
+    return parser.parse_args()
+
+def print_report(report: dict) -> None:
+    print(f'{"scenario":<16}{"endpoint":<28}{"count":>8}{"errors":>8}{"req/s":>10}'
+          f'{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+    for scenario, endpoints in report.items():
+        for endpoint, result in endpoints.items():
+            print(f'{scenario:<16}{endpoint:<28}{result["count"]:>8}{result["errors"]:>8}{result["throughput"]:>10}'
+                  f'{result["p50_ms"]:>10}{result["p95_ms"]:>10}{result["p99_ms"]:>10}')
+
+def main() -> int:
+    args = parse_args()
+    os.environ['POSTGRES_DB'] = args.database
+    os.environ.setdefault('RATE_LIMIT', 'false')
+    from .runner import run
+    from .scenarios import SCENARIOS
+    from .seed import SeedSize
+    from .stats import compare
+    size = SeedSize(users=args.users, channel_ratio=args.channel_ratio, posts_per_channel=args.posts_per_channel,
+                    follows_per_user=args.follows_per_user, seed=args.seed)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        print(f'Unknown scenarios: {", ".join(sorted(unknown))}', file=sys.stderr)
+        return 2
+    config = {**size.dict(), 'concurrency': args.concurrency, 'duration': args.duration}
+    report = asyncio.run(run(args.scenarios or list(SCENARIOS), size, args.concurrency, args.duration, args.warmup))
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'config': config, 'results': report}, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline['config'] != config:
+            print('Baseline was recorded with a different configuration, results may not be comparable',
+                  file=sys.stderr)
+        regressions = compare(report, baseline['results'], args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
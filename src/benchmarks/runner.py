@@ -0,0 +1,41 @@
+import asyncio
+import random
+import time
+from typing import Iterable
+import httpx
+from main import app
+from auth.hash_password import shutdown_executor
+from database.connection import engine
+from .scenarios import SCENARIOS, Recorder
+from .seed import Dataset, SeedSize, seed
+from .stats import summarize
+
+async def run_scenario(name: str, dataset: Dataset, concurrency: int, duration: float, warmup: float,
+                       rng_seed: int) -> dict:
+    scenario = SCENARIOS[name]
+    async with httpx.AsyncClient(app=app, base_url='http://benchmark') as client:
+        async def worker(worker_id: int, recorder: Recorder, deadline: float) -> None:
+            rng = random.Random(f'{rng_seed}:{name}:{worker_id}')
+            while time.perf_counter() < deadline:
+                await scenario(client, recorder, dataset, rng)
+
+        if warmup:
+            await asyncio.gather(*(worker(index, Recorder(), time.perf_counter() + warmup)
+                                   for index in range(concurrency)))
+        recorder = Recorder()
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(index, recorder, start + duration) for index in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {endpoint: summarize(samples, recorder.errors[endpoint], elapsed)
+            for endpoint, samples in sorted(recorder.samples.items())}
+
+async def run(scenarios: Iterable[str], size: SeedSize, concurrency: int, duration: float, warmup: float) -> dict:
+    report = {}
+    try:
+        for name in scenarios:
+            dataset = await seed(size)
+            report[name] = await run_scenario(name, dataset, concurrency, duration, warmup, size.seed)
+    finally:
+        shutdown_executor()
+        await engine.dispose()
+    return report
@@ -0,0 +1,61 @@
+import itertools
+import random
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict
+import httpx
+from .seed import Dataset
+
+class Recorder:
+    def __init__(self) -> None:
+        self.samples: Dict[str, list] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str,
+                      **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.samples[endpoint].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[endpoint] += 1
+        return response
+
+Scenario = Callable[[httpx.AsyncClient, Recorder, Dataset, random.Random], Awaitable[None]]
+
+def _auth(token: str) -> dict:
+    return {'Authorization': f'Bearer {token}'}
+
+_signups = itertools.count()
+
+async def auth_storm(client: httpx.AsyncClient, recorder: Recorder, dataset: Dataset, rng: random.Random) -> None:
+    index = next(_signups)
+    username = f'storm{index}'
+    await recorder.request(client, 'POST /users/signup', 'POST', '/users/signup',
+                           json={'username': username, 'password': dataset.password,
+                                 'email': f'storm{index}@example.com'})
+    await recorder.request(client, 'POST /users/signin', 'POST', '/users/signin',
+                           data={'username': username, 'password': dataset.password})
+
+async def feed_reading(client: httpx.AsyncClient, recorder: Recorder, dataset: Dataset, rng: random.Random) -> None:
+    headers = _auth(rng.choice(dataset.tokens))
+    response = await recorder.request(client, 'GET /users/me/feed', 'GET', '/users/me/feed', headers=headers)
+    cursor = response.json().get('next_cursor') if response.status_code == 200 else None
+    if cursor:
+        await recorder.request(client, 'GET /users/me/feed?after', 'GET', '/users/me/feed',
+                               params={'after': cursor}, headers=headers)
+
+async def hot_post_likes(client: httpx.AsyncClient, recorder: Recorder, dataset: Dataset, rng: random.Random) -> None:
+    await recorder.request(client, 'POST /posts/like/{id}', 'POST', f'/posts/like/{dataset.hot_post_id}',
+                           headers=_auth(rng.choice(dataset.tokens)))
+
+async def comment_burst(client: httpx.AsyncClient, recorder: Recorder, dataset: Dataset, rng: random.Random) -> None:
+    await recorder.request(client, 'POST /comments/{id}', 'POST', f'/comments/{dataset.hot_post_id}',
+                           json={'description': 'benchmark comment'}, headers=_auth(rng.choice(dataset.tokens)))
+    await recorder.request(client, 'GET /posts/{id}', 'GET', f'/posts/{dataset.hot_post_id}')
+
+SCENARIOS: Dict[str, Scenario] = {
+    'auth_storm': auth_storm,
+    'feed_reading': feed_reading,
+    'hot_post_likes': hot_post_likes,
+    'comment_burst': comment_burst
+}
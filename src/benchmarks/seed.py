@@ -0,0 +1,86 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+from pydantic import BaseModel
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from auth.hash_password import HashPassword
+from auth.jwt_handler import create_access_token
+from database.connection import async_session, drop_models, init_models, settings
+from database.counters import reconcile_counters
+from models.users import User, user_channel
+from models.channels import Channel
+from models.posts import Post
+from models.feed import FeedEntry
+
+CHUNK_SIZE = 1000
+PASSWORD = 'benchmark'
+
+class SeedSize(BaseModel):
+    users: int = 200
+    channel_ratio: float = 0.2
+    posts_per_channel: int = 20
+    follows_per_user: int = 10
+    seed: int = 0
+
+class Dataset(BaseModel):
+    user_ids: List[uuid.UUID]
+    usernames: List[str]
+    tokens: List[str]
+    channel_ids: List[uuid.UUID]
+    post_ids: List[uuid.UUID]
+    hot_post_id: uuid.UUID
+    password: str = PASSWORD
+
+async def create_database() -> None:
+    engine = create_async_engine(settings.url.set(database='postgres'), isolation_level='AUTOCOMMIT')
+    async with engine.connect() as conn:
+        exists = await conn.execute(text('SELECT 1 FROM pg_database WHERE datname = :name'),
+                                    {'name': settings.postgres_db})
+        if exists.scalar() is None:
+            await conn.execute(text(f'CREATE DATABASE "{settings.postgres_db}"'))
+    await engine.dispose()
+
+async def _insert(session, table, rows: List[dict]) -> None:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        await session.execute(insert(table), rows[start:start + CHUNK_SIZE])
+
+async def seed(size: SeedSize) -> Dataset:
+    rng = random.Random(size.seed)
+
+    def new_id() -> uuid.UUID:
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    await create_database()
+    await drop_models()
+    await init_models()
+    hashed = HashPassword().create_hash(PASSWORD)
+    now = datetime.utcnow()
+    users = [{'id': new_id(), 'username': f'bench{index}', 'email': f'bench{index}@example.com', 'password': hashed}
+             for index in range(size.users)]
+    owners = rng.sample(users, max(int(size.users * size.channel_ratio), 1))
+    channels = [{'id': new_id(), 'name': f'channel{index}', 'user_id': owner['id']}
+                for index, owner in enumerate(owners)]
+    posts = [{'id': new_id(), 'name': f'post{index}', 'description': 'benchmark post', 'channel_id': channel['id'],
+              'created': now - timedelta(seconds=index)}
+             for index, channel in enumerate(channel for channel in channels for _ in range(size.posts_per_channel))]
+    follows = [{'user_id': user['id'], 'channel_id': channel['id']}
+               for user in users
+               for channel in rng.sample(channels, min(size.follows_per_user, len(channels)))
+               if channel['user_id'] != user['id']]
+    async with async_session() as session:
+        await _insert(session, User, users)
+        await _insert(session, Channel, channels)
+        await _insert(session, Post, posts)
+        await _insert(session, user_channel, follows)
+        await session.execute(insert(FeedEntry).from_select(
+            ['user_id', 'created', 'post_id', 'channel_id'],
+            select(user_channel.c.user_id, Post.created, Post.id, Post.channel_id)
+            .join(Post, Post.channel_id == user_channel.c.channel_id)))
+        await session.commit()
+        await reconcile_counters(session)
+    return Dataset(user_ids=[user['id'] for user in users], usernames=[user['username'] for user in users],
+                   tokens=[create_access_token(user['username'], user['id']) for user in users],
+                   channel_ids=[channel['id'] for channel in channels], post_ids=[post['id'] for post in posts],
+                   hot_post_id=posts[0]['id'])
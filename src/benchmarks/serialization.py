@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from database.pagination import schema_columns
+from models import users, channels, comments, feed
+from models.posts import Post
+from schemas.posts import PostResponse, PostPage
+from .stats import percentile
+
+def make_posts(count: int) -> List[Post]:
+    now = datetime.utcnow()
+    channel_id = uuid.uuid4()
+    return [Post(id=uuid.uuid4(), name=f'post{index}', description='benchmark post', created=now - timedelta(seconds=index),
+                 updated=None, likes_count=index, comments_count=index // 2, channel_id=channel_id)
+            for index in range(count)]
+
+async def validated(posts: List[Post], rows: List[tuple], field) -> bytes:
+    content = await serialize_response(field=field, response_content={'items': posts, 'next_cursor': None},
+                                       exclude_unset=True, is_coroutine=True)
+    return JSONResponse(content).body
+
+async def fast(posts: List[Post], rows: List[tuple], field) -> bytes:
+    names = [column.key for column in schema_columns(Post, PostResponse)]
+    return orjson.dumps({'items': [dict(zip(names, row)) for row in rows], 'next_cursor': None}, default=str)
+
+async def measure(path: Callable, posts: List[Post], rows: List[tuple], field, iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await path(posts, rows, field)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.serialization',
+                                     description='Compare validated and fast serialization of a page of posts.')
+    parser.add_argument('--items', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+    posts = make_posts(args.items)
+    names = [column.key for column in schema_columns(Post, PostResponse)]
+    rows = [tuple(getattr(post, name) for name in names) for post in posts]
+    field = create_response_field(name='page', type_=PostPage)
+    assert orjson.loads(await fast(posts, rows, field)) == orjson.loads(await validated(posts, rows, field))
+    print(f'{"path":<12}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"pages/s":>10}')
+    for name, path in (('validated', validated), ('fast', fast)):
+        samples = await measure(path, posts, rows, field, args.iterations)
+        print(f'{name:<12}{percentile(samples, 50) * 1000:>10.3f}{percentile(samples, 95) * 1000:>10.3f}'
+              f'{percentile(samples, 99) * 1000:>10.3f}{len(samples) / sum(samples):>10.0f}')
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,35 @@
+import math
+from typing import Dict, List, Sequence
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(q / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+def summarize(samples: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'errors': errors,
+        'throughput': round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3)
+    }
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    regressions = []
+    for scenario, endpoints in baseline.items():
+        for endpoint, before in endpoints.items():
+            after = current.get(scenario, {}).get(endpoint)
+            if after is None:
+                continue
+            for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+                if before[metric] and after[metric] > before[metric] * (1 + threshold):
+                    regressions.append(f'{scenario} {endpoint}: {metric} {before[metric]} -> {after[metric]}')
+            if before['throughput'] and after['throughput'] < before['throughput'] * (1 - threshold):
+                regressions.append(f'{scenario} {endpoint}: throughput {before["throughput"]} -> {after["throughput"]}')
+    return regressions
@@ -0,0 +1,142 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+class CacheBackend(ABC):
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    async def get(self, key: str, variant: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, variant: str, value: bytes, tags: Iterable[str] = ()) -> None:
+        ...
+
+    @abstractmethod
+    async def invalidate(self, *tags: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0
+        }
+
+class MemoryBackend(CacheBackend):
+    def __init__(self, max_bytes: int, ttl: float) -> None:
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._tags: Dict[str, Set[Tuple[str, str]]] = {}
+
+    async def get(self, key: str, variant: str) -> Optional[bytes]:
+        entry = self._entries.get((key, variant))
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                self._remove((key, variant))
+            self.misses += 1
+            return None
+        self._entries.move_to_end((key, variant))
+        self.hits += 1
+        return entry[0]
+
+    async def set(self, key: str, variant: str, value: bytes, tags: Iterable[str] = ()) -> None:
+        if len(value) > self.max_bytes:
+            return
+        self._remove((key, variant))
+        tags = {key, *tags}
+        self._entries[(key, variant)] = (value, time.time() + self.ttl, tags)
+        self.bytes += len(value)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add((key, variant))
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    async def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            for entry_key in self._tags.pop(tag, ()):
+                self._remove(entry_key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self.bytes = 0
+
+    def _remove(self, entry_key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        self.bytes -= len(entry[0])
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(entry_key)
+                if not keys:
+                    del self._tags[tag]
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            'backend': 'memory',
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes
+        }
+
+class RedisBackend(CacheBackend):
+    def __init__(self, url: str, ttl: float, prefix: str = 'response:') -> None:
+        super().__init__()
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError('RedisBackend requires the redis package')
+        self.client = redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def _key(self, key: str, variant: str) -> str:
+        return f'{self.prefix}{key}|{variant}'
+
+    def _tag(self, tag: str) -> str:
+        return f'{self.prefix}tag:{tag}'
+
+    async def get(self, key: str, variant: str) -> Optional[bytes]:
+        value = await self.client.get(self._key(key, variant))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, variant: str, value: bytes, tags: Iterable[str] = ()) -> None:
+        entry_key = self._key(key, variant)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(entry_key, value, ex=self.ttl)
+            for tag in {key, *tags}:
+                pipe.sadd(self._tag(tag), entry_key)
+                pipe.expire(self._tag(tag), self.ttl)
+            await pipe.execute()
+
+    async def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            entry_keys = await self.client.smembers(self._tag(tag))
+            await self.client.delete(self._tag(tag), *entry_keys)
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f'{self.prefix}*'):
+            await self.client.delete(key)
+
+    def stats(self) -> dict:
+        return {**super().stats(), 'backend': 'redis'}
@@ -0,0 +1,45 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response, status
+
+def make_etag(request: Request, version: str) -> str:
+    digest = hashlib.blake2b(f'{request.url.path}?{request.url.query}|{version}'.encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+def validators(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+def is_fresh(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return '*' in tags or etag in tags
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+def not_modified(request: Request, version: str, last_modified: Optional[datetime] = None) -> Optional[Response]:
+    etag = make_etag(request, version)
+    if is_fresh(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators(etag, last_modified))
+    return None
+
+def conditional_response(request: Request, content: bytes, version: str,
+                         last_modified: Optional[datetime] = None) -> Response:
+    return Response(content=content, media_type='application/json',
+                    headers=validators(make_etag(request, version), last_modified))
@@ -0,0 +1,47 @@
+import os
+from typing import Iterable, Optional
+from uuid import UUID
+from fastapi import Response
+from pydantic import BaseModel
+from cache.backends import CacheBackend, MemoryBackend, RedisBackend
+
+RESPONSE_CACHE_BACKEND: str = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+RESPONSE_CACHE_URL: str = os.getenv('RESPONSE_CACHE_URL', 'redis://localhost:6379/0')
+RESPONSE_CACHE_TTL: float = float(os.getenv('RESPONSE_CACHE_TTL', 30))
+RESPONSE_CACHE_MAX_BYTES: int = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+def create_backend() -> CacheBackend:
+    if RESPONSE_CACHE_BACKEND == 'redis':
+        return RedisBackend(RESPONSE_CACHE_URL, RESPONSE_CACHE_TTL)
+    return MemoryBackend(RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_TTL)
+
+response_cache = create_backend()
+_generation = 0
+
+def entity_key(kind: str, id: UUID) -> str:
+    return f'{kind}:{id}'
+
+def generation() -> int:
+    return _generation
+
+async def invalidate(kind: str, *ids: UUID) -> None:
+    global _generation
+    _generation += 1
+    await response_cache.invalidate(*(entity_key(kind, id) for id in ids if id is not None))
+
+def json_response(content: bytes) -> Response:
+    return Response(content=content, media_type='application/json')
+
+async def load(kind: str, id: UUID, variant: str, version: str) -> Optional[bytes]:
+    value = await response_cache.get(entity_key(kind, id), variant)
+    if value is None:
+        return None
+    stored, _, content = value.partition(b'\n')
+    return content if stored == version.encode() else None
+
+async def store(kind: str, id: UUID, variant: str, version: str, model: BaseModel, fill: Optional[int],
+                tags: Iterable[str] = ()) -> bytes:
+    content = model.json(exclude_unset=True).encode()
+    if fill is not None and fill == _generation:
+        await response_cache.set(entity_key(kind, id), variant, version.encode() + b'\n' + content, tags)
+    return content
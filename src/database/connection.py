@@ -2,15 +2,27 @@ from sqlalchemy.orm import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from dotenv import load_dotenv
 import os
+from database.settings import DatabaseSettings
+from metrics.database import InstrumentedPool, instrument_engine
 
 load_dotenv()
 
-DATABASE_URL: str = f'postgresql+asyncpg://{os.getenv("POSTGRES_USER")}:{os.getenv("POSTGRES_PASSWORD")}@db:5432/postgres'
+settings = DatabaseSettings()
+
+DATABASE_URL: str = settings.url.render_as_string(hide_password=False)
 SECRET_KEY: str = os.getenv('SECRET_KEY')
 
 Base = declarative_base()
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(settings.url, poolclass=InstrumentedPool, pool_logging_name='primary',
+                             **settings.engine_options())
+instrument_engine(engine, 'primary')
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+read_engine = create_async_engine(settings.replica_url, poolclass=InstrumentedPool, pool_logging_name='replica',
+                                  **settings.engine_options()) if settings.replica_url else None
+if read_engine:
+    instrument_engine(read_engine, 'replica')
+async_read_session = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False) \
+    if read_engine else None
 
 async def init_models() -> None:
     async with engine.begin() as conn:
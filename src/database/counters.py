@@ -0,0 +1,51 @@
+import asyncio
+from typing import Dict
+from uuid import UUID
+from sqlalchemy import select, update, case, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.users import user_channel, user_post
+from models.channels import Channel
+from models.posts import Post
+from models.comments import Comment
+from database.connection import async_session
+
+async def increment(session: AsyncSession, column, id: UUID, delta: int = 1) -> None:
+    model = column.class_
+    await session.execute(update(model).where(model.id == id)
+                          .values({column.key: column + delta, 'updated': model.updated}))
+
+async def increment_many(session: AsyncSession, column, deltas: Dict[UUID, int]) -> None:
+    model = column.class_
+    deltas = {id: delta for id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    await session.execute(update(model).where(model.id.in_(list(deltas)))
+                          .values({column.key: column + case(deltas, value=model.id, else_=0), 'updated': model.updated})
+                          .execution_options(synchronize_session=False))
+
+async def _reconcile(session: AsyncSession, column, source, key) -> int:
+    model = column.class_
+    actual = select(model.id.label('id'), func.count(key).label('total')) \
+        .outerjoin(source, key == model.id).group_by(model.id).subquery()
+    result = await session.execute(update(model).where(model.id == actual.c.id).where(column != actual.c.total)
+                                   .values({column.key: actual.c.total, 'updated': model.updated})
+                                   .execution_options(synchronize_session=False))
+    return result.rowcount
+
+async def reconcile_counters(session: AsyncSession) -> dict:
+    repaired = {
+        'posts.likes_count': await _reconcile(session, Post.likes_count, user_post, user_post.c.post_id),
+        'posts.comments_count': await _reconcile(session, Post.comments_count, Comment, Comment.post_id),
+        'channels.followers_count': await _reconcile(session, Channel.followers_count, user_channel,
+                                                     user_channel.c.channel_id),
+    }
+    await session.commit()
+    return repaired
+
+async def main() -> None:
+    async with async_session() as session:
+        for counter, rows in (await reconcile_counters(session)).items():
+            print(f'{counter}: {rows} rows repaired')
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,25 @@
+import os
+from datetime import datetime
+from typing import AsyncIterator, Optional
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.pagination import schema_columns
+
+EXPORT_CHUNK_SIZE: int = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))
+
+def changed_since(model, since: Optional[datetime]) -> list:
+    if since is None:
+        return []
+    return [or_(model.created >= since, model.updated >= since)]
+
+async def stream_ndjson(session: AsyncSession, model, schema: BaseModel, *criteria,
+                        chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    columns = schema_columns(model, schema)
+    names = [column.key for column in columns]
+    stmt = select(*columns).where(*criteria).order_by(model.created, model.id) \
+        .execution_options(yield_per=chunk_size)
+    result = await session.stream(stmt)
+    async for rows in result.partitions():
+        yield b''.join(orjson.dumps(dict(zip(names, row)), default=str) + b'\n' for row in rows)
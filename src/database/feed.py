@@ -0,0 +1,73 @@
+import os
+from datetime import datetime
+from typing import Collection, Optional
+from uuid import UUID
+from sqlalchemy import select, insert, update, delete, func, literal, DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.users import user_channel
+from models.channels import Channel
+from models.posts import Post
+from models.feed import FeedEntry
+from database.pagination import keyset, next_cursor
+from database.purge import visible
+
+FEED_FANOUT_LIMIT: int = int(os.getenv('FEED_FANOUT_LIMIT', 10000))
+FEED_BACKFILL: int = int(os.getenv('FEED_BACKFILL', 50))
+
+async def fan_out_post(session: AsyncSession, post_id: UUID, channel_id: UUID, created: datetime) -> None:
+    followers = await session.execute(select(Channel.followers_count).where(Channel.id == channel_id))
+    if followers.scalar() > FEED_FANOUT_LIMIT:
+        await session.execute(update(Channel).where(Channel.id == channel_id).where(Channel.fan_out_on_read.is_(False))
+                              .values(fan_out_on_read=True, updated=Channel.updated))
+        return
+    rows = select(user_channel.c.user_id, literal(post_id, PG_UUID(as_uuid=True)),
+                  literal(channel_id, PG_UUID(as_uuid=True)), literal(created, DateTime)) \
+        .where(user_channel.c.channel_id == channel_id)
+    await session.execute(insert(FeedEntry).from_select(['user_id', 'post_id', 'channel_id', 'created'], rows))
+
+async def fan_out_posts(session: AsyncSession, post_ids: Collection[UUID], channel_ids: Collection[UUID]) -> None:
+    await session.execute(update(Channel).where(Channel.id.in_(channel_ids))
+                          .where(Channel.followers_count > FEED_FANOUT_LIMIT).where(Channel.fan_out_on_read.is_(False))
+                          .values(fan_out_on_read=True, updated=Channel.updated))
+    rows = select(user_channel.c.user_id, Post.id, Post.channel_id, Post.created) \
+        .join(Post, Post.channel_id == user_channel.c.channel_id).join(Channel, Channel.id == Post.channel_id) \
+        .where(Post.id.in_(post_ids)).where(Channel.fan_out_on_read.is_(False))
+    await session.execute(insert(FeedEntry).from_select(['user_id', 'post_id', 'channel_id', 'created'], rows))
+
+async def backfill_feed(session: AsyncSession, user_id: UUID, channel_id: UUID) -> None:
+    fan_out_on_read = await session.execute(select(Channel.fan_out_on_read).where(Channel.id == channel_id))
+    if fan_out_on_read.scalar():
+        return
+    rows = select(literal(user_id, PG_UUID(as_uuid=True)), Post.id, Post.channel_id, Post.created) \
+        .where(Post.channel_id == channel_id).order_by(Post.created.desc()).limit(FEED_BACKFILL)
+    await session.execute(insert(FeedEntry).from_select(['user_id', 'post_id', 'channel_id', 'created'], rows))
+
+async def backfill_feeds(session: AsyncSession, user_id: UUID, channel_ids: Collection[UUID]) -> None:
+    rank = func.row_number().over(partition_by=Post.channel_id, order_by=Post.created.desc()).label('rank')
+    ranked = select(Post.id, Post.channel_id, Post.created, rank).join(Channel, Channel.id == Post.channel_id) \
+        .where(Post.channel_id.in_(channel_ids)).where(Channel.fan_out_on_read.is_(False)).subquery()
+    rows = select(literal(user_id, PG_UUID(as_uuid=True)), ranked.c.id, ranked.c.channel_id, ranked.c.created) \
+        .where(ranked.c.rank <= FEED_BACKFILL)
+    await session.execute(insert(FeedEntry).from_select(['user_id', 'post_id', 'channel_id', 'created'], rows))
+
+async def clear_feed(session: AsyncSession, user_id: UUID, channel_id: UUID) -> None:
+    await session.execute(delete(FeedEntry).where(FeedEntry.user_id == user_id).where(FeedEntry.channel_id == channel_id))
+
+async def clear_feeds(session: AsyncSession, user_id: UUID, channel_ids: Collection[UUID]) -> None:
+    await session.execute(delete(FeedEntry).where(FeedEntry.user_id == user_id)
+                          .where(FeedEntry.channel_id.in_(channel_ids)))
+
+async def read_feed(session: AsyncSession, user_id: UUID, limit: int, after: Optional[str]) -> dict:
+    entries = select(Post).join(FeedEntry, FeedEntry.post_id == Post.id).where(FeedEntry.user_id == user_id) \
+        .where(visible(Post))
+    results = await session.execute(keyset(entries, FeedEntry.created, FeedEntry.post_id, limit, after))
+    rows = {post.id: post for post in results.scalars().all()}
+    merged = select(Post).join(user_channel, user_channel.c.channel_id == Post.channel_id) \
+        .join(Channel, Channel.id == Post.channel_id) \
+        .where(user_channel.c.user_id == user_id).where(Channel.fan_out_on_read.is_(True)) \
+        .where(Channel.deleted_at.is_(None))
+    results = await session.execute(keyset(merged, Post.created, Post.id, limit, after))
+    rows.update((post.id, post) for post in results.scalars().all())
+    posts = sorted(rows.values(), key=lambda post: (post.created, post.id), reverse=True)[:limit + 1]
+    return {'items': posts[:limit], 'next_cursor': next_cursor(posts, limit)}
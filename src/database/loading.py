@@ -0,0 +1,25 @@
+from typing import Iterable, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.strategy_options import Load
+
+def expand_paths(expand: Optional[str], allowed: Iterable[str]) -> List[str]:
+    if not expand:
+        return []
+    paths = sorted({path.strip() for path in expand.split(',') if path.strip()})
+    unknown = [path for path in paths if path not in allowed]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f'Cannot expand {", ".join(unknown)}')
+    return paths
+
+def expand_options(model, expand: Optional[str], allowed: Iterable[str]) -> List[Load]:
+    options = []
+    for path in expand_paths(expand, allowed):
+        loader, entity = None, model
+        for name in path.split('.'):
+            attr = getattr(entity, name)
+            loader = selectinload(attr) if loader is None else loader.selectinload(attr)
+            entity = attr.property.mapper.class_
+        options.append(loader)
+    return options
@@ -0,0 +1,57 @@
+import base64
+import binascii
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+from uuid import UUID
+import orjson
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_LIMIT: int = 20
+MAX_LIMIT: int = 100
+
+def encode_cursor(created: datetime, id: UUID) -> str:
+    raw = f'{created.isoformat()}|{id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created, id = raw.split('|')
+        return datetime.fromisoformat(created), UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid cursor')
+
+def keyset(stmt: Select, created_column, id_column, limit: int, after: Optional[str]) -> Select:
+    if after:
+        created, id = decode_cursor(after)
+        stmt = stmt.where(tuple_(created_column, id_column) < tuple_(created, id))
+    return stmt.order_by(created_column.desc(), id_column.desc()).limit(limit + 1)
+
+def next_cursor(rows: list, limit: int) -> Optional[str]:
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(last.created, last.id)
+
+async def paginate(session: AsyncSession, stmt: Select, model, limit: int, after: Optional[str]) -> dict:
+    results = await session.execute(keyset(stmt, model.created, model.id, limit, after))
+    rows = list(results.scalars().all())
+    return {'items': rows[:limit], 'next_cursor': next_cursor(rows, limit)}
+
+@lru_cache(maxsize=None)
+def schema_columns(model, schema: BaseModel) -> tuple:
+    columns = model.__table__.c
+    return tuple(getattr(model, name) for name in schema.__fields__ if name in columns)
+
+async def paginate_json(session: AsyncSession, model, schema: BaseModel, limit: int, after: Optional[str],
+                        *criteria) -> bytes:
+    columns = schema_columns(model, schema)
+    stmt = keyset(select(*columns).where(*criteria), model.created, model.id, limit, after)
+    rows = (await session.execute(stmt)).all()
+    names = [column.key for column in columns]
+    return orjson.dumps({'items': [dict(zip(names, row)) for row in rows[:limit]],
+                         'next_cursor': next_cursor(rows, limit)}, default=str)
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import select, delete, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+from database.connection import async_session
+from models.channels import Channel
+from models.posts import Post
+from models.comments import Comment
+
+logger = logging.getLogger(__name__)
+
+PURGE_CHUNK_SIZE: int = int(os.getenv('PURGE_CHUNK_SIZE', 1000))
+PURGE_PAUSE: float = float(os.getenv('PURGE_PAUSE', 0.05))
+PURGE_INTERVAL: float = float(os.getenv('PURGE_INTERVAL', 60))
+
+def hidden_channel(channel_id) -> ColumnElement:
+    return exists().where(Channel.id == channel_id).where(Channel.deleted_at.is_not(None))
+
+def visible(model) -> ColumnElement:
+    if model is Channel:
+        return Channel.deleted_at.is_(None)
+    if model is Post:
+        return ~hidden_channel(Post.channel_id)
+    return ~exists().where(Post.id == Comment.post_id).where(hidden_channel(Post.channel_id))
+
+class ChannelPurger:
+    def __init__(self, chunk_size: int = PURGE_CHUNK_SIZE, pause: float = PURGE_PAUSE,
+                 session_factory=async_session) -> None:
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.session_factory = session_factory
+        self._wakeup = asyncio.Event()
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def _delete_chunk(self, session: AsyncSession, model, ids) -> int:
+        result = await session.execute(delete(model).where(model.id.in_(
+            ids.limit(self.chunk_size).with_for_update(of=model, skip_locked=True).scalar_subquery())))
+        await session.commit()
+        return result.rowcount
+
+    async def purge_channel(self, session: AsyncSession, channel_id: UUID) -> None:
+        comments = select(Comment.id).join(Post, Post.id == Comment.post_id).where(Post.channel_id == channel_id)
+        while await self._delete_chunk(session, Comment, comments):
+            await asyncio.sleep(self.pause)
+        posts = select(Post.id).where(Post.channel_id == channel_id)
+        while await self._delete_chunk(session, Post, posts):
+            await asyncio.sleep(self.pause)
+        await session.execute(delete(Channel).where(Channel.id == channel_id).where(Channel.deleted_at.is_not(None)))
+        await session.commit()
+
+    async def purge(self) -> int:
+        async with self.session_factory() as session:
+            channel_ids = await session.execute(select(Channel.id).where(Channel.deleted_at.is_not(None))
+                                                .order_by(Channel.deleted_at))
+            channel_ids = channel_ids.scalars().all()
+            for channel_id in channel_ids:
+                await self.purge_channel(session, channel_id)
+            return len(channel_ids)
+
+    async def run(self, interval: float) -> None:
+        while True:
+            try:
+                await self.purge()
+            except Exception:
+                logger.exception('Channel purge failed')
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+channel_purger = ChannelPurger()
+
+_task: Optional[asyncio.Task] = None
+
+def start_purge() -> None:
+    global _task
+    if _task is None:
+        _task = asyncio.get_running_loop().create_task(channel_purger.run(PURGE_INTERVAL))
+
+async def stop_purge() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+from uuid import UUID
+from auth.cache import TTLCache
+
+class RecentWritesBackend(ABC):
+    @abstractmethod
+    async def mark(self, user_id: UUID) -> None:
+        ...
+
+    @abstractmethod
+    async def seen(self, user_id: UUID) -> bool:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+class MemoryBackend(RecentWritesBackend):
+    def __init__(self, window: float, max_users: int = 100000) -> None:
+        self.writes = TTLCache(maxsize=max_users, ttl=window)
+
+    async def mark(self, user_id: UUID) -> None:
+        self.writes.set(user_id, True)
+
+    async def seen(self, user_id: UUID) -> bool:
+        return self.writes.get(user_id, False)
+
+    async def clear(self) -> None:
+        self.writes.clear()
+
+class RedisBackend(RecentWritesBackend):
+    def __init__(self, url: str, window: float, prefix: str = 'writes:') -> None:
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError('RedisBackend requires the redis package')
+        self.client = redis.from_url(url)
+        self.window = window
+        self.prefix = prefix
+
+    async def mark(self, user_id: UUID) -> None:
+        await self.client.set(f'{self.prefix}{user_id}', 1, px=max(1, int(self.window * 1000)))
+
+    async def seen(self, user_id: UUID) -> bool:
+        return bool(await self.client.exists(f'{self.prefix}{user_id}'))
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f'{self.prefix}*'):
+            await self.client.delete(key)
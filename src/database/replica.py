@@ -0,0 +1,109 @@
+import time
+from typing import Optional
+from uuid import UUID
+from fastapi import HTTPException, Request
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from auth.jwt_handler import verify_access_token
+from database.connection import async_session, async_read_session, read_engine, settings
+from database.recent_writes import RecentWritesBackend, MemoryBackend, RedisBackend
+
+REPLICA_LAG_QUERY = text(
+    'SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+def token_user_id(authorization: str) -> Optional[UUID]:
+    scheme, _, token = authorization.partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    try:
+        user_id = verify_access_token(token).get('id')
+    except HTTPException:
+        return None
+    return UUID(user_id) if user_id is not None else None
+
+class ReplicaRouter:
+    def __init__(self, engine: Optional[AsyncEngine], max_lag: float, check_interval: float,
+                 read_your_writes_window: float, recent_writes: Optional[RecentWritesBackend] = None) -> None:
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.available = engine is not None
+        self.lag: Optional[float] = None
+        self.checked_at = float('-inf')
+        self.recent_writes = recent_writes or MemoryBackend(read_your_writes_window)
+
+    async def mark_write(self, user_id: UUID) -> None:
+        await self.recent_writes.mark(user_id)
+
+    async def wrote_recently(self, user_id: UUID) -> bool:
+        return await self.recent_writes.seen(user_id)
+
+    async def replica_available(self) -> bool:
+        if self.engine is None:
+            return False
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return self.available
+        self.checked_at = now
+        try:
+            async with self.engine.connect() as conn:
+                result = await conn.execute(REPLICA_LAG_QUERY)
+                self.lag = float(result.scalar() or 0)
+            self.available = self.lag <= self.max_lag
+        except (SQLAlchemyError, OSError):
+            self.lag = None
+            self.available = False
+        return self.available
+
+    async def use_replica(self, request: Request) -> bool:
+        if not await self.replica_available():
+            return False
+        user_id = token_user_id(request.headers.get('authorization', ''))
+        return user_id is None or not await self.wrote_recently(user_id)
+
+def create_recent_writes() -> RecentWritesBackend:
+    if settings.db_read_your_writes_backend == 'redis':
+        return RedisBackend(settings.db_read_your_writes_url, settings.db_read_your_writes_window)
+    return MemoryBackend(settings.db_read_your_writes_window)
+
+replica_router = ReplicaRouter(read_engine, max_lag=settings.db_replica_max_lag,
+                               check_interval=settings.db_replica_check_interval,
+                               read_your_writes_window=settings.db_read_your_writes_window,
+                               recent_writes=create_recent_writes())
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app: ASGIApp, router: ReplicaRouter = replica_router) -> None:
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] in SAFE_METHODS or self.router.engine is None:
+            await self.app(scope, receive, send)
+            return
+        user_id = token_user_id(Headers(scope=scope).get('authorization', ''))
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_after_commit(message: Message) -> None:
+            if message['type'] == 'http.response.start' and message['status'] < 400:
+                await self.router.mark_write(user_id)
+            await send(message)
+
+        await self.app(scope, receive, send_after_commit)
+
+def on_replica(session: AsyncSession) -> bool:
+    return session.info.get('replica', False)
+
+async def get_read_session(request: Request) -> AsyncSession:
+    replica = await replica_router.use_replica(request)
+    async with (async_read_session if replica else async_session)() as session:
+        session.info['replica'] = replica
+        yield session
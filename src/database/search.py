@@ -0,0 +1,40 @@
+import base64
+import binascii
+from typing import Optional, Tuple
+from uuid import UUID
+import orjson
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.pagination import schema_columns
+
+SEARCH_CONFIG: str = 'english'
+
+def encode_rank_cursor(rank: float, id: UUID) -> str:
+    raw = f'{rank!r}|{id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        rank, id = raw.split('|')
+        return float(rank), UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid cursor')
+
+async def search_json(session: AsyncSession, model, schema: BaseModel, q: str, limit: int, after: Optional[str],
+                      *criteria) -> bytes:
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank(model.search_vector, query)
+    columns = schema_columns(model, schema)
+    stmt = select(*columns, rank.label('rank')).where(model.search_vector.bool_op('@@')(query), *criteria)
+    if after:
+        after_rank, after_id = decode_rank_cursor(after)
+        stmt = stmt.where(tuple_(rank, model.id) < tuple_(after_rank, after_id))
+    stmt = stmt.order_by(rank.desc(), model.id.desc()).limit(limit + 1)
+    rows = (await session.execute(stmt)).all()
+    names = [column.key for column in columns] + ['rank']
+    cursor = encode_rank_cursor(rows[limit - 1].rank, rows[limit - 1].id) if len(rows) > limit else None
+    return orjson.dumps({'items': [dict(zip(names, row)) for row in rows[:limit]], 'next_cursor': cursor},
+                        default=str)
@@ -0,0 +1,67 @@
+from typing import Optional
+from pydantic import BaseSettings
+from sqlalchemy.engine import URL
+
+class DatabaseSettings(BaseSettings):
+    postgres_user: Optional[str]
+    postgres_password: Optional[str]
+    postgres_host: str = 'db'
+    postgres_port: int = 5432
+    postgres_db: str = 'postgres'
+    db_echo: bool = False
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    db_pgbouncer: bool = False
+    db_statement_timeout_ms: int = 0
+    db_command_timeout: Optional[float]
+    postgres_replica_host: Optional[str]
+    postgres_replica_port: Optional[int]
+    postgres_replica_db: Optional[str]
+    db_replica_max_lag: float = 5
+    db_replica_check_interval: float = 5
+    db_read_your_writes_window: float = 5
+    db_read_your_writes_backend: str = 'memory'
+    db_read_your_writes_url: str = 'redis://localhost:6379/2'
+
+    @property
+    def url(self) -> URL:
+        return URL.create('postgresql+asyncpg', username=self.postgres_user, password=self.postgres_password,
+                          host=self.postgres_host, port=self.postgres_port, database=self.postgres_db)
+
+    @property
+    def replica_url(self) -> Optional[URL]:
+        if not self.postgres_replica_host:
+            return None
+        return self.url.set(host=self.postgres_replica_host, port=self.postgres_replica_port or self.postgres_port,
+                            database=self.postgres_replica_db or self.postgres_db)
+
+    @property
+    def max_connections(self) -> int:
+        return self.db_pool_size + self.db_max_overflow
+
+    def connect_args(self) -> dict:
+        cache_size = 0 if self.db_pgbouncer else self.db_statement_cache_size
+        server_settings = {}
+        if self.db_statement_timeout_ms:
+            server_settings['statement_timeout'] = str(self.db_statement_timeout_ms)
+        return {
+            'statement_cache_size': cache_size,
+            'prepared_statement_cache_size': cache_size,
+            'command_timeout': self.db_command_timeout,
+            'server_settings': server_settings
+        }
+
+    def engine_options(self) -> dict:
+        return {
+            'echo': self.db_echo,
+            'pool_size': self.db_pool_size,
+            'max_overflow': self.db_max_overflow,
+            'pool_timeout': self.db_pool_timeout,
+            'pool_recycle': self.db_pool_recycle,
+            'pool_pre_ping': self.db_pool_pre_ping,
+            'connect_args': self.connect_args()
+        }
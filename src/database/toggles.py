@@ -0,0 +1,268 @@
+"""Write-behind buffering for like and follow toggles.
+
+Toggles are answered from memory and written to the association table by
+a periodic flush. A flush applies the final desired state of every
+touched (user, target) pair in one transaction. Inserts skip rows that
+already exist and deletes skip rows that are already gone, and counters
+move only by the rows that actually changed, so replaying a flush is
+harmless.
+
+Pending toggles are capped at WRITE_BEHIND_MAX_PENDING pairs. The flusher
+is woken once half of that is in use, and a toggle for a new pair that
+finds the buffer full flushes it inline before buffering. If that flush
+fails the toggle is refused with 503 rather than growing the buffer.
+
+On shutdown the loop is cancelled and whatever is pending is flushed.
+If the process dies first, up to one interval of toggles is lost unless
+WRITE_BEHIND_JOURNAL names a file. In that case every toggle is appended
+to the journal before it is acknowledged, the journal is rotated when a
+flush starts and the rotated file is removed once the flush commits.
+On startup any journal files left behind are replayed as desired states.
+The journal only survives a process crash, not a host crash, and each
+worker process needs its own WRITE_BEHIND_JOURNAL path.
+"""
+import asyncio
+import glob
+import json
+import logging
+import math
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import Table, select, delete, exists, func, cast, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import async_session
+from database.counters import increment_many
+from database.feed import backfill_feeds, clear_feeds
+from database.purge import visible
+from models.users import User, user_post, user_channel
+from models.channels import Channel
+from models.posts import Post
+from cache.responses import invalidate
+
+WRITE_BEHIND: bool = os.getenv('WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+WRITE_BEHIND_INTERVAL: float = float(os.getenv('WRITE_BEHIND_INTERVAL', 1))
+WRITE_BEHIND_MAX_PENDING: int = int(os.getenv('WRITE_BEHIND_MAX_PENDING', 10000))
+WRITE_BEHIND_JOURNAL: Optional[str] = os.getenv('WRITE_BEHIND_JOURNAL')
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[UUID, UUID]
+
+class ToggleBuffer:
+    def __init__(self, table: Table, target_key: str, target_model, counter, kind: str,
+                 interval: float = WRITE_BEHIND_INTERVAL, max_pending: int = WRITE_BEHIND_MAX_PENDING,
+                 journal: Optional[str] = None, after_flush: Optional[Callable] = None,
+                 session_factory: Callable[[], AsyncSession] = async_session) -> None:
+        self.table = table
+        self.user_column = table.c.user_id
+        self.target_column = table.c[target_key]
+        self.target_model = target_model
+        self.counter = counter
+        self.kind = kind
+        self.interval = interval
+        self.max_pending = max_pending
+        self.journal = journal
+        self.after_flush = after_flush
+        self.session_factory = session_factory
+        self.pending: Dict[Pair, List[Optional[bool]]] = {}
+        self._journal_file = None
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def _record(self, pair: Pair, desired: bool) -> None:
+        if self.journal is None:
+            return
+        if self._journal_file is None:
+            self._journal_file = open(self.journal, 'a')
+        self._journal_file.write(json.dumps([str(pair[0]), str(pair[1]), desired]) + '\n')
+        self._journal_file.flush()
+
+    def _set(self, pair: Pair, original: Optional[bool], desired: bool) -> None:
+        entry = self.pending.get(pair)
+        if entry is None:
+            self.pending[pair] = [original, desired]
+        else:
+            entry[1] = desired
+        self._record(pair, desired)
+        if len(self.pending) * 2 >= self.max_pending:
+            self._wakeup.set()
+
+    async def _make_room(self) -> None:
+        try:
+            await self.flush()
+        except (SQLAlchemyError, OSError):
+            logger.exception('Inline %s write-behind flush failed', self.kind)
+        if len(self.pending) >= self.max_pending:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail='Too many pending writes',
+                                headers={'Retry-After': str(math.ceil(self.interval))})
+
+    async def toggle(self, session: AsyncSession, user_id: UUID, target_id: UUID) -> Optional[bool]:
+        pair = (user_id, target_id)
+        if pair not in self.pending and len(self.pending) >= self.max_pending:
+            await self._make_room()
+        entry = self.pending.get(pair)
+        if entry is None:
+            state = await session.execute(
+                select(exists().where(self.user_column == user_id).where(self.target_column == target_id))
+                .where(self.target_model.id == target_id).where(visible(self.target_model)))
+            current = state.scalar()
+            if current is None:
+                return None
+            entry = self.pending.get(pair)
+            if entry is None:
+                self._set(pair, current, not current)
+                return not current
+        self._set(pair, entry[0], not entry[1])
+        return entry[1]
+
+    def _rotate_journal(self) -> Optional[str]:
+        if self._journal_file is None:
+            return None
+        self._journal_file.close()
+        self._journal_file = None
+        rotated = f'{self.journal}.{time.time_ns()}.flushing'
+        os.replace(self.journal, rotated)
+        return rotated
+
+    def _restore(self, batch: Dict[Pair, List[Optional[bool]]]) -> None:
+        for pair, (original, desired) in batch.items():
+            entry = self.pending.get(pair)
+            if entry is None:
+                self.pending[pair] = [original, desired]
+                self._record(pair, desired)
+            else:
+                entry[0] = original
+
+    def _pairs(self, pairs: List[Pair]):
+        users = cast([user for user, _ in pairs], ARRAY(PG_UUID(as_uuid=True)))
+        targets = cast([target for _, target in pairs], ARRAY(PG_UUID(as_uuid=True)))
+        return select(func.unnest(users).label('user_id'), func.unnest(targets).label('target_id')).subquery()
+
+    async def _apply(self, session: AsyncSession, batch: Dict[Pair, List[Optional[bool]]]) -> Tuple[list, list]:
+        added = [pair for pair, (original, desired) in batch.items() if desired and original is not True]
+        removed = [pair for pair, (original, desired) in batch.items() if not desired and original is not False]
+        inserted, deleted = [], []
+        if removed:
+            result = await session.execute(delete(self.table)
+                                           .where(tuple_(self.user_column, self.target_column).in_(removed))
+                                           .returning(self.user_column, self.target_column))
+            deleted = [tuple(row) for row in result.all()]
+        if added:
+            pairs = self._pairs(added)
+            rows = select(pairs.c.user_id, pairs.c.target_id) \
+                .join(User, User.id == pairs.c.user_id) \
+                .join(self.target_model, self.target_model.id == pairs.c.target_id) \
+                .where(visible(self.target_model))
+            result = await session.execute(insert(self.table).from_select(['user_id', self.target_column.key], rows)
+                                           .on_conflict_do_nothing()
+                                           .returning(self.user_column, self.target_column))
+            inserted = [tuple(row) for row in result.all()]
+        deltas: Dict[UUID, int] = {}
+        for _, target in inserted:
+            deltas[target] = deltas.get(target, 0) + 1
+        for _, target in deleted:
+            deltas[target] = deltas.get(target, 0) - 1
+        await increment_many(session, self.counter, deltas)
+        if self.after_flush is not None:
+            await self.after_flush(session, inserted, deleted)
+        return inserted, deleted
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self.pending:
+                return 0
+            batch, self.pending = self.pending, {}
+            rotated = self._rotate_journal()
+            try:
+                async with self.session_factory() as session:
+                    inserted, deleted = await self._apply(session, batch)
+                    await session.commit()
+            except BaseException:
+                self._restore(batch)
+                if rotated is not None:
+                    os.remove(rotated)
+                raise
+            if rotated is not None:
+                os.remove(rotated)
+            await invalidate(self.kind, *{target for _, target in inserted + deleted})
+            return len(inserted) + len(deleted)
+
+    def _replay_file(self, path: str) -> None:
+        with open(path) as file:
+            for line in file:
+                try:
+                    user_id, target_id, desired = json.loads(line)
+                    self._set((UUID(user_id), UUID(target_id)), None, bool(desired))
+                except ValueError:
+                    continue
+
+    def replay(self) -> None:
+        if self.journal is None:
+            return
+        if os.path.exists(self.journal):
+            os.replace(self.journal, f'{self.journal}.{time.time_ns()}.flushing')
+        for path in sorted(glob.glob(f'{glob.escape(self.journal)}.*.flushing')):
+            self._replay_file(path)
+            os.remove(path)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except (SQLAlchemyError, OSError):
+                logger.exception('%s write-behind flush failed, %d pairs pending', self.kind, len(self.pending))
+                await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self.replay()
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+async def _update_feeds(session: AsyncSession, followed: List[Pair], unfollowed: List[Pair]) -> None:
+    for pairs, update in ((unfollowed, clear_feeds), (followed, backfill_feeds)):
+        channels: Dict[UUID, List[UUID]] = {}
+        for user_id, channel_id in pairs:
+            channels.setdefault(user_id, []).append(channel_id)
+        for user_id, channel_ids in channels.items():
+            await update(session, user_id, channel_ids)
+
+def _journal(name: str) -> Optional[str]:
+    return f'{WRITE_BEHIND_JOURNAL}.{name}' if WRITE_BEHIND_JOURNAL else None
+
+like_buffer = ToggleBuffer(user_post, 'post_id', Post, Post.likes_count, 'post', journal=_journal('likes'))
+follow_buffer = ToggleBuffer(user_channel, 'channel_id', Channel, Channel.followers_count, 'channel',
+                             journal=_journal('follows'), after_flush=_update_feeds)
+
+def start_write_behind() -> None:
+    if WRITE_BEHIND:
+        like_buffer.start()
+        follow_buffer.start()
+
+async def stop_write_behind() -> None:
+    if WRITE_BEHIND:
+        await like_buffer.stop()
+        await follow_buffer.stop()
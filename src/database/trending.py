@@ -0,0 +1,181 @@
+import asyncio
+import heapq
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, func, literal
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import async_session
+from database.pagination import schema_columns
+from database.purge import visible
+from models.users import user_post
+from models.posts import Post
+from models.comments import Comment
+from schemas.posts import PostSummary
+
+TRENDING_HALF_LIFE: float = float(os.getenv('TRENDING_HALF_LIFE', 6 * 3600))
+TRENDING_WINDOW: float = float(os.getenv('TRENDING_WINDOW', 48 * 3600))
+TRENDING_SIZE: int = int(os.getenv('TRENDING_SIZE', 100))
+TRENDING_BUCKETS: int = int(os.getenv('TRENDING_BUCKETS', 48))
+TRENDING_REFRESH_INTERVAL: float = float(os.getenv('TRENDING_REFRESH_INTERVAL', 30))
+TRENDING_LAG: float = float(os.getenv('TRENDING_LAG', 5))
+TRENDING_LIKE_WEIGHT: float = float(os.getenv('TRENDING_LIKE_WEIGHT', 1))
+TRENDING_COMMENT_WEIGHT: float = float(os.getenv('TRENDING_COMMENT_WEIGHT', 2))
+
+logger = logging.getLogger(__name__)
+
+class TrendingIndex:
+    def __init__(self, half_life: float, window: float, size: int, like_weight: float, comment_weight: float,
+                 buckets: int = TRENDING_BUCKETS, lag: float = 0) -> None:
+        self.half_life = half_life
+        self.window = timedelta(seconds=window)
+        self.bucket_width = window / buckets
+        self.size = size
+        self.like_weight = like_weight
+        self.comment_weight = comment_weight
+        self.lag = timedelta(seconds=lag)
+        self.epoch: Optional[datetime] = None
+        self.watermark: Optional[datetime] = None
+        self.scores: Dict[UUID, float] = {}
+        self.buckets: Deque[Tuple[datetime, Dict[UUID, float]]] = deque()
+        self.liked: Dict[Tuple[UUID, UUID], datetime] = {}
+        self.likes: Deque[Tuple[datetime, Tuple[UUID, UUID]]] = deque()
+        self.items: List[dict] = []
+        self.refreshed_at: Optional[datetime] = None
+        self._refreshed_monotonic = 0.0
+
+    def _growth(self, at: datetime) -> float:
+        return 2 ** ((at - self.epoch).total_seconds() / self.half_life)
+
+    def add(self, contributions: Dict[UUID, float], at: datetime) -> None:
+        for post_id, score in contributions.items():
+            self.scores[post_id] = self.scores.get(post_id, 0.0) + score
+        if self.buckets and self.buckets[-1][0] == at:
+            bucket = self.buckets[-1][1]
+            for post_id, score in contributions.items():
+                bucket[post_id] = bucket.get(post_id, 0.0) + score
+        else:
+            self.buckets.append((at, contributions))
+
+    def expire(self, now: datetime) -> None:
+        cutoff = now - self.window
+        while self.buckets and self.buckets[0][0] < cutoff:
+            _, contributions = self.buckets.popleft()
+            for post_id, score in contributions.items():
+                remaining = self.scores.get(post_id, 0.0) - score
+                if remaining <= 1e-9 * score:
+                    self.scores.pop(post_id, None)
+                else:
+                    self.scores[post_id] = remaining
+        while self.likes and self.likes[0][0] < cutoff:
+            _, key = self.likes.popleft()
+            self.liked.pop(key, None)
+
+    def rebase(self, now: datetime) -> None:
+        if (now - self.epoch).total_seconds() < 64 * self.half_life:
+            return
+        factor = 1 / self._growth(now)
+        self.scores = {post_id: score * factor for post_id, score in self.scores.items()}
+        self.buckets = deque((at, {post_id: score * factor for post_id, score in contributions.items()})
+                             for at, contributions in self.buckets)
+        self.epoch = now
+
+    def top(self, limit: int) -> List[dict]:
+        if self.refreshed_at is None:
+            return []
+        now = self.refreshed_at + timedelta(seconds=time.monotonic() - self._refreshed_monotonic)
+        decay = 1 / self._growth(now)
+        return [{**item, 'score': item['score'] * decay} for item in self.items[:limit]]
+
+    def _events(self, post_id, created, weight: float, since: datetime, until: datetime):
+        elapsed = func.extract('epoch', created - self.epoch)
+        return select(post_id.label('post_id'), func.floor(elapsed / self.bucket_width).label('bucket'),
+                      (literal(weight) * func.power(2, elapsed / self.half_life)).label('score')) \
+            .where(created > since, created <= until, post_id.is_not(None))
+
+    def _bucket_end(self, bucket: float) -> datetime:
+        return self.epoch + timedelta(seconds=(int(bucket) + 1) * self.bucket_width)
+
+    async def _likes(self, session: AsyncSession, since: datetime, until: datetime,
+                     buckets: Dict[datetime, Dict[UUID, float]]) -> None:
+        result = await session.execute(select(user_post.c.user_id, user_post.c.post_id, user_post.c.created)
+                                       .where(user_post.c.created > since, user_post.c.created <= until)
+                                       .order_by(user_post.c.created))
+        for user_id, post_id, created in result.all():
+            if (user_id, post_id) in self.liked:
+                continue
+            self.liked[(user_id, post_id)] = created
+            self.likes.append((created, (user_id, post_id)))
+            elapsed = (created - self.epoch).total_seconds()
+            bucket = buckets.setdefault(self._bucket_end(elapsed // self.bucket_width), {})
+            bucket[post_id] = bucket.get(post_id, 0.0) + self.like_weight * 2 ** (elapsed / self.half_life)
+
+    async def _activity(self, session: AsyncSession, since: datetime,
+                        until: datetime) -> Dict[datetime, Dict[UUID, float]]:
+        activity = self._events(Comment.post_id, Comment.created, self.comment_weight, since, until).subquery()
+        result = await session.execute(select(activity.c.bucket, activity.c.post_id, func.sum(activity.c.score))
+                                       .group_by(activity.c.bucket, activity.c.post_id))
+        buckets: Dict[datetime, Dict[UUID, float]] = {}
+        for bucket, post_id, score in result.all():
+            buckets.setdefault(self._bucket_end(bucket), {})[post_id] = float(score)
+        await self._likes(session, since, until, buckets)
+        return dict(sorted(buckets.items()))
+
+    async def refresh(self, session: AsyncSession) -> None:
+        now = (await session.execute(select(func.localtimestamp()))).scalar()
+        until = now - self.lag
+        if self.epoch is None:
+            self.epoch = until
+        since = self.watermark or until - self.window
+        if until > since:
+            for end, contributions in (await self._activity(session, since, until)).items():
+                self.add(contributions, end)
+            self.watermark = until
+        self.expire(now)
+        self.rebase(now)
+        leaders = heapq.nlargest(self.size, self.scores.items(), key=lambda item: item[1])
+        columns = schema_columns(Post, PostSummary)
+        names = [column.key for column in columns]
+        rows = await session.execute(select(*columns).where(Post.id.in_([post_id for post_id, _ in leaders]))
+                                     .where(visible(Post)))
+        posts = {row.id: dict(zip(names, row)) for row in rows.all()}
+        for post_id, _ in leaders:
+            if post_id not in posts:
+                self.scores.pop(post_id, None)
+        self.items = [{**posts[post_id], 'score': score} for post_id, score in leaders if post_id in posts]
+        self.refreshed_at = now
+        self._refreshed_monotonic = time.monotonic()
+
+    async def run(self, interval: float) -> None:
+        while True:
+            try:
+                async with async_session() as session:
+                    await self.refresh(session)
+            except (SQLAlchemyError, OSError):
+                logger.exception('Trending refresh failed')
+            await asyncio.sleep(interval)
+
+trending_index = TrendingIndex(TRENDING_HALF_LIFE, TRENDING_WINDOW, TRENDING_SIZE, TRENDING_LIKE_WEIGHT,
+                               TRENDING_COMMENT_WEIGHT, lag=TRENDING_LAG)
+
+_task: Optional[asyncio.Task] = None
+
+def start_trending() -> None:
+    global _task
+    if _task is None:
+        _task = asyncio.get_running_loop().create_task(trending_index.run(TRENDING_REFRESH_INTERVAL))
+
+async def stop_trending() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -0,0 +1,46 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import Text, select, func, cast, true, literal
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.pagination import keyset
+
+Version = Tuple[str, Optional[datetime]]
+
+@lru_cache(maxsize=None)
+def version_columns(model) -> tuple:
+    return tuple(getattr(model, column.key) for column in model.__table__.c if column.computed is None)
+
+def modified(model):
+    return func.coalesce(model.updated, model.created)
+
+def fingerprint(columns: Iterable, *order_by):
+    row = cast(func.json_build_array(*columns), Text)
+    return func.coalesce(func.md5(func.string_agg(row, aggregate_order_by(literal('|'), *order_by))), '')
+
+async def entity_version(session: AsyncSession, model, id: UUID, paths: Iterable[str] = (),
+                         *criteria) -> Optional[Version]:
+    root = select(fingerprint(version_columns(model), model.id).label('hash'), func.max(modified(model)).label('modified')) \
+        .where(model.id == id, *criteria).subquery()
+    stmt = select(root.c.hash, root.c.modified).where(root.c.modified.is_not(None))
+    prefixes = {'.'.join(path.split('.')[:depth]) for path in paths for depth in range(1, path.count('.') + 2)}
+    for path in sorted(prefixes):
+        leaf, child = model, select().select_from(model)
+        for name in path.split('.'):
+            relationship = getattr(leaf, name)
+            leaf = relationship.property.mapper.class_
+            child = child.join(relationship)
+        child = child.add_columns(fingerprint(version_columns(leaf), leaf.id).label('hash'),
+                                  func.max(modified(leaf)).label('modified')).where(model.id == id).subquery()
+        stmt = stmt.join_from(root, child, true()).add_columns(child.c.hash, child.c.modified)
+    row = (await session.execute(stmt)).first()
+    if row is None:
+        return None
+    return ':'.join(row[::2]), max((value for value in row[1::2] if value is not None), default=None)
+
+async def list_version(session: AsyncSession, model, limit: int, after: Optional[str], *criteria) -> str:
+    page = keyset(select(*version_columns(model)).where(*criteria), model.created, model.id, limit, after).subquery()
+    result = await session.execute(select(fingerprint(page.c, page.c.created.desc(), page.c.id.desc())))
+    return result.scalar()
@@ -0,0 +1,48 @@
+from typing import Any
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import select, insert, update, delete, literal
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+from models.channels import Channel
+from models.posts import Post
+from models.comments import Comment
+
+def owns_channel(user_id: UUID) -> ColumnElement:
+    return (Channel.user_id == user_id) & Channel.deleted_at.is_(None)
+
+def owns_post(user_id: UUID) -> ColumnElement:
+    return Post.channel_id.in_(select(Channel.id).where(owns_channel(user_id)))
+
+def owns_comment(user_id: UUID) -> ColumnElement:
+    return Comment.user_id == user_id
+
+async def insert_owned(session: AsyncSession, model, values: dict, owner: ColumnElement, detail: str,
+                       *returning: Any) -> Row:
+    columns = model.__table__.c
+    source = select(*(literal(value, columns[key].type) for key, value in values.items())).where(owner)
+    result = await session.execute(insert(model).from_select(list(values), source)
+                                   .returning(*(returning or (model.id,))))
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    return row
+
+async def update_owned(session: AsyncSession, model, id: UUID, owner: ColumnElement, values: dict,
+                       detail: str) -> Any:
+    result = await session.execute(update(model).where(model.id == id).where(owner).values(**values)
+                                   .returning(model).execution_options(synchronize_session=False))
+    instance = result.scalar()
+    if instance is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    return instance
+
+async def delete_owned(session: AsyncSession, model, id: UUID, owner: ColumnElement, detail: str,
+                       *returning: Any) -> Row:
+    result = await session.execute(delete(model).where(model.id == id).where(owner)
+                                   .returning(*(returning or (model.id,))))
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    return row
@@ -1,32 +1,92 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
 from routes.users import user_router
 from routes.channels import channel_router
 from routes.posts import post_router
 from routes.comments import comment_router
-from database.connection import init_models
+from routes.health import health_router
+from routes.metrics import metrics_router
+from routes.export import export_router
+from routes.search import search_router
+from routes.events import events_router
+from metrics.middleware import MetricsMiddleware
+from ratelimit.limiter import RateLimitMiddleware
+from database.replica import ReadYourWritesMiddleware
+from auth.hash_password import shutdown_executor
+from database.connection import engine, read_engine
+from database.trending import start_trending, stop_trending
+from database.toggles import start_write_behind, stop_write_behind
+from database.purge import start_purge, stop_purge
+from realtime.broker import broker
 
 app = FastAPI()
 
 origins = ['*']
 
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(user_router, prefix='/users')
 app.include_router(channel_router, prefix='/channels')
 app.include_router(post_router, prefix='/posts')
 app.include_router(comment_router, prefix='/comments')
+app.include_router(health_router, prefix='/health')
+app.include_router(export_router, prefix='/export')
+app.include_router(search_router, prefix='/search')
+app.include_router(events_router, prefix='/events')
+app.include_router(metrics_router)
 
 @app.on_event('startup')
-async def init_db() -> None:
-    await init_models()
+async def refresh_trending() -> None:
+    start_trending()
 
-# if __name__ == '__main__':
-#     uvicorn.run('main:app', host='0.0.0.0', port=8000, reload=True)
+@app.on_event('startup')
+async def listen_events() -> None:
+    broker.start()
+
+@app.on_event('startup')
+async def buffer_toggles() -> None:
+    start_write_behind()
+
+@app.on_event('startup')
+async def purge_channels() -> None:
+    start_purge()
+
+@app.on_event('shutdown')
+async def shutdown_hashing() -> None:
+    shutdown_executor()
+
+@app.on_event('shutdown')
+async def shutdown_trending() -> None:
+    await stop_trending()
+
+@app.on_event('shutdown')
+async def shutdown_events() -> None:
+    await broker.stop()
+
+@app.on_event('shutdown')
+async def flush_toggles() -> None:
+    await stop_write_behind()
+
+@app.on_event('shutdown')
+async def shutdown_purge() -> None:
+    await stop_purge()
+
+@app.on_event('shutdown')
+async def dispose_engines() -> None:
+    await engine.dispose()
+    if read_engine:
+        await read_engine.dispose()
+
+if __name__ == '__main__':
+    from server import run
+    run()
@@ -0,0 +1,21 @@
+from .registry import Registry, Counter, Gauge, Histogram
+
+registry = Registry()
+
+http_requests = registry.counter('http_requests_total', 'Total HTTP requests.', ('method', 'route', 'status'))
+http_request_duration = registry.histogram('http_request_duration_seconds', 'HTTP request latency.',
+                                           ('method', 'route'))
+http_requests_in_progress = registry.gauge('http_requests_in_progress', 'HTTP requests being served.', ('method',))
+sql_statements = registry.histogram('http_request_sql_statements', 'SQL statements executed per HTTP request.',
+                                    ('method', 'route'), buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100))
+sql_duration = registry.histogram('http_request_sql_duration_seconds', 'Time spent in SQL per HTTP request.',
+                                  ('method', 'route'))
+db_statements = registry.counter('db_statements_total', 'Total SQL statements executed.', ('engine',))
+db_pool_wait = registry.histogram('db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection.',
+                                  ('engine',))
+db_pool_checked_out = registry.gauge('db_pool_checked_out', 'Connections currently checked out of the pool.',
+                                     ('engine',))
+bcrypt_queue = registry.histogram('bcrypt_queue_seconds', 'Time bcrypt work waited for an executor worker.',
+                                  ('operation',))
+bcrypt_duration = registry.histogram('bcrypt_duration_seconds', 'Time spent hashing or verifying passwords.',
+                                     ('operation',))
@@ -0,0 +1,43 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from . import db_statements, db_pool_wait, db_pool_checked_out
+
+class QueryStats:
+    __slots__ = ('count', 'duration')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+request_queries: ContextVar[Optional[QueryStats]] = ContextVar('request_queries', default=None)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait.observe(time.perf_counter() - start, self.logging_name or 'default')
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+def instrument_engine(engine: AsyncEngine, name: str = 'default') -> None:
+    sync_engine = engine.sync_engine
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        db_statements.inc(name)
+        stats = request_queries.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+
+    event.listen(sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', after_cursor_execute)
+    event.listen(sync_engine.pool, 'checkout', lambda *args: db_pool_checked_out.inc(name))
+    event.listen(sync_engine.pool, 'checkin', lambda *args: db_pool_checked_out.dec(name))
@@ -0,0 +1,52 @@
+import time
+from typing import Callable, Dict
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from . import http_requests, http_request_duration, http_requests_in_progress, sql_statements, sql_duration
+from .database import QueryStats, request_queries
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._routes: Dict[Callable, str] = {}
+
+    def route_path(self, scope: Scope) -> str:
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        path = self._routes.get(endpoint)
+        if path is None:
+            for route in scope['app'].routes:
+                self._routes.setdefault(getattr(route, 'endpoint', None), getattr(route, 'path', UNMATCHED_ROUTE))
+            path = self._routes.setdefault(endpoint, UNMATCHED_ROUTE)
+        return path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        method = scope['method']
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        stats = QueryStats()
+        token = request_queries.set(stats)
+        http_requests_in_progress.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_progress.dec(method)
+            request_queries.reset(token)
+            route = self.route_path(scope)
+            http_requests.inc(method, route, str(status_code))
+            http_request_duration.observe(elapsed, method, route)
+            sql_statements.observe(stats.count, method, route)
+            sql_duration.observe(stats.duration, method, route)
@@ -0,0 +1,78 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 10:28:36.634600
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('username', sa.String(length=32), nullable=False),
+    sa.Column('password', sa.String(length=64), nullable=False),
+    sa.Column('email', sa.String(length=32), nullable=False),
+    sa.Column('created', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('username')
+    )
+    op.create_table('channels',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=32), nullable=False),
+    sa.Column('avatar', sa.String(length=64), nullable=True),
+    sa.Column('description', sa.String(length=64), nullable=True),
+    sa.Column('created', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated', sa.DateTime(), nullable=True),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('posts',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=32), nullable=False),
+    sa.Column('description', sa.String(length=64), nullable=False),
+    sa.Column('created', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated', sa.DateTime(), nullable=True),
+    sa.Column('channel_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['channel_id'], ['channels.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('user_channel',
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('channel_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['channel_id'], ['channels.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], )
+    )
+    op.create_table('comments',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('description', sa.String(length=64), nullable=False),
+    sa.Column('created', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated', sa.DateTime(), nullable=True),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('post_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('user_post',
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('post_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], )
+    )
+
+def downgrade() -> None:
+    op.drop_table('user_post')
+    op.drop_table('comments')
+    op.drop_table('user_channel')
+    op.drop_table('posts')
+    op.drop_table('channels')
+    op.drop_table('users')
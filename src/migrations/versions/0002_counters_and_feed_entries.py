@@ -0,0 +1,58 @@
+"""denormalized counters, fan-out flag and materialized feed entries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:28:44.207315
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+FEED_FANOUT_LIMIT: int = int(os.getenv('FEED_FANOUT_LIMIT', 10000))
+FEED_BACKFILL: int = int(os.getenv('FEED_BACKFILL', 50))
+
+COUNTERS = (
+    ('posts', 'likes_count', 'user_post', 'post_id'),
+    ('posts', 'comments_count', 'comments', 'post_id'),
+    ('channels', 'followers_count', 'user_channel', 'channel_id'),
+)
+
+def upgrade() -> None:
+    for table, column, source, key in COUNTERS:
+        op.add_column(table, sa.Column(column, sa.Integer(), server_default='0', nullable=False))
+        op.execute(f'UPDATE {table} SET {column} = actual.total FROM '
+                   f'(SELECT {key}, count(*) AS total FROM {source} WHERE {key} IS NOT NULL GROUP BY {key}) AS actual '
+                   f'WHERE {table}.id = actual.{key}')
+    op.add_column('channels', sa.Column('fan_out_on_read', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+    op.execute(f'UPDATE channels SET fan_out_on_read = true WHERE followers_count > {FEED_FANOUT_LIMIT}')
+    op.create_table('feed_entries',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('created', sa.DateTime(), nullable=False),
+    sa.Column('post_id', sa.UUID(), nullable=False),
+    sa.Column('channel_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['channel_id'], ['channels.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'created', 'post_id')
+    )
+    op.create_index('ix_feed_entries_user_id_channel_id', 'feed_entries', ['user_id', 'channel_id'], unique=False)
+    op.execute('INSERT INTO feed_entries (user_id, created, post_id, channel_id) '
+               'SELECT DISTINCT user_channel.user_id, ranked.created, ranked.id, ranked.channel_id FROM user_channel '
+               'JOIN (SELECT posts.id, posts.channel_id, posts.created, row_number() OVER '
+               '(PARTITION BY posts.channel_id ORDER BY posts.created DESC) AS rank FROM posts '
+               'JOIN channels ON channels.id = posts.channel_id '
+               'WHERE channels.fan_out_on_read IS false AND posts.created IS NOT NULL) AS ranked '
+               'ON ranked.channel_id = user_channel.channel_id '
+               f'WHERE user_channel.user_id IS NOT NULL AND ranked.rank <= {FEED_BACKFILL}')
+
+def downgrade() -> None:
+    op.drop_index('ix_feed_entries_user_id_channel_id', table_name='feed_entries')
+    op.drop_table('feed_entries')
+    op.drop_column('channels', 'fan_out_on_read')
+    for table, column, source, key in reversed(COUNTERS):
+        op.drop_column(table, column)
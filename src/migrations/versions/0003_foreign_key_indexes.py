@@ -0,0 +1,53 @@
+"""foreign key indexes, association primary keys and pagination indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:28:52.513098
+"""
+from alembic import op
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+ASSOCIATIONS = (('user_channel', 'channel_id'), ('user_post', 'post_id'))
+
+def upgrade() -> None:
+    for table, column in ASSOCIATIONS:
+        op.execute(f'DELETE FROM {table} WHERE user_id IS NULL OR {column} IS NULL')
+        op.execute(f'DELETE FROM {table} a USING {table} b '
+                   f'WHERE a.ctid < b.ctid AND a.user_id = b.user_id AND a.{column} = b.{column}')
+        op.create_primary_key(f'{table}_pkey', table, ['user_id', column])
+        op.create_index(f'ix_{table}_{column}', table, [column])
+    op.execute('UPDATE posts SET likes_count = actual.total FROM '
+               '(SELECT posts.id, count(user_post.post_id) AS total FROM posts '
+               'LEFT OUTER JOIN user_post ON user_post.post_id = posts.id GROUP BY posts.id) AS actual '
+               'WHERE posts.id = actual.id AND posts.likes_count != actual.total')
+    op.execute('UPDATE channels SET followers_count = actual.total FROM '
+               '(SELECT channels.id, count(user_channel.channel_id) AS total FROM channels '
+               'LEFT OUTER JOIN user_channel ON user_channel.channel_id = channels.id GROUP BY channels.id) AS actual '
+               'WHERE channels.id = actual.id AND channels.followers_count != actual.total')
+    op.create_index('ix_channels_user_id', 'channels', ['user_id'])
+    op.create_index('ix_channels_created_id', 'channels', ['created', 'id'])
+    op.create_index('ix_posts_created_id', 'posts', ['created', 'id'])
+    op.create_index('ix_posts_channel_id_created_id', 'posts', ['channel_id', 'created', 'id'])
+    op.create_index('ix_comments_user_id', 'comments', ['user_id'])
+    op.create_index('ix_comments_created_id', 'comments', ['created', 'id'])
+    op.create_index('ix_comments_post_id_created_id', 'comments', ['post_id', 'created', 'id'])
+    op.create_index('ix_feed_entries_post_id', 'feed_entries', ['post_id'])
+
+def downgrade() -> None:
+    op.drop_index('ix_feed_entries_post_id', table_name='feed_entries')
+    op.drop_index('ix_comments_post_id_created_id', table_name='comments')
+    op.drop_index('ix_comments_created_id', table_name='comments')
+    op.drop_index('ix_comments_user_id', table_name='comments')
+    op.drop_index('ix_posts_channel_id_created_id', table_name='posts')
+    op.drop_index('ix_posts_created_id', table_name='posts')
+    op.drop_index('ix_channels_created_id', table_name='channels')
+    op.drop_index('ix_channels_user_id', table_name='channels')
+    for table, column in reversed(ASSOCIATIONS):
+        op.drop_index(f'ix_{table}_{column}', table_name=table)
+        op.drop_constraint(f'{table}_pkey', table, type_='primary')
+        op.alter_column(table, column, nullable=True)
+        op.alter_column(table, 'user_id', nullable=True)
@@ -0,0 +1,31 @@
+"""full-text search vectors on posts and comments
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 11:02:41.318204
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTORS = (('posts', "to_tsvector('english', name || ' ' || description)"),
+                  ('comments', "to_tsvector('english', description)"))
+
+def upgrade() -> None:
+    for table, expression in SEARCH_VECTORS:
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(),
+                                       sa.Computed(expression, persisted=True), nullable=True))
+    with op.get_context().autocommit_block():
+        for table, _ in SEARCH_VECTORS:
+            op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], postgresql_using='gin',
+                            postgresql_concurrently=True)
+
+def downgrade() -> None:
+    for table, _ in reversed(SEARCH_VECTORS):
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
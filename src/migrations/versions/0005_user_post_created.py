@@ -0,0 +1,22 @@
+"""like timestamps for trending
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 11:41:07.904512
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('user_post', sa.Column('created', sa.DateTime(), nullable=True))
+    op.alter_column('user_post', 'created', server_default=sa.text('now()'))
+    op.create_index('ix_user_post_created', 'user_post', ['created'])
+
+def downgrade() -> None:
+    op.drop_index('ix_user_post_created', table_name='user_post')
+    op.drop_column('user_post', 'created')
@@ -0,0 +1,41 @@
+"""cascading deletes and soft-hidden channels
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:02:45.118230
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+FOREIGN_KEYS = (
+    ('channels', 'user_id', 'users'),
+    ('posts', 'channel_id', 'channels'),
+    ('comments', 'user_id', 'users'),
+    ('comments', 'post_id', 'posts'),
+    ('user_channel', 'user_id', 'users'),
+    ('user_channel', 'channel_id', 'channels'),
+    ('user_post', 'user_id', 'users'),
+    ('user_post', 'post_id', 'posts'),
+)
+
+def replace_foreign_keys(ondelete) -> None:
+    for table, column, referent in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referent, [column], ['id'], ondelete=ondelete)
+
+def upgrade() -> None:
+    replace_foreign_keys('CASCADE')
+    op.add_column('channels', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_channels_deleted_at', 'channels', ['deleted_at'],
+                    postgresql_where=sa.text('deleted_at IS NOT NULL'))
+
+def downgrade() -> None:
+    op.drop_index('ix_channels_deleted_at', table_name='channels')
+    op.drop_column('channels', 'deleted_at')
+    replace_foreign_keys(None)
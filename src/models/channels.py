@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey, Index, false, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
@@ -7,6 +7,8 @@ from database.connection import Base
 
 class Channel(Base):
     __tablename__ = 'channels'
+    __table_args__ = (Index('ix_channels_created_id', 'created', 'id'),
+                      Index('ix_channels_deleted_at', 'deleted_at', postgresql_where=text('deleted_at IS NOT NULL')))
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(32), nullable=False)
@@ -14,5 +16,8 @@ class Channel(Base):
     description = Column(String(64), nullable=True)
     created = Column(DateTime, server_default=func.now())
     updated = Column(DateTime, onupdate=func.now())
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'))
-    posts = relationship('Post', backref='channel', cascade='all, delete-orphan', lazy='selectin')
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), index=True)
+    followers_count = Column(Integer, nullable=False, default=0, server_default='0')
+    fan_out_on_read = Column(Boolean, nullable=False, default=False, server_default=false())
+    deleted_at = Column(DateTime, nullable=True)
+    posts = relationship('Post', backref='channel', cascade='all, delete-orphan', passive_deletes=True, lazy='raise')
@@ -1,15 +1,20 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Computed
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 import uuid
 from database.connection import Base
 
 class Comment(Base):
     __tablename__ = 'comments'
+    __table_args__ = (Index('ix_comments_created_id', 'created', 'id'),
+                      Index('ix_comments_post_id_created_id', 'post_id', 'created', 'id'),
+                      Index('ix_comments_search_vector', 'search_vector', postgresql_using='gin'))
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     description = Column(String(64), nullable=False)
     created = Column(DateTime, server_default=func.now())
     updated = Column(DateTime, onupdate=func.now())
-    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'))
-    post_id = Column(UUID(as_uuid=True), ForeignKey('posts.id'))
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), index=True)
+    post_id = Column(UUID(as_uuid=True), ForeignKey('posts.id', ondelete='CASCADE'))
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('english', description)", persisted=True)))
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from database.connection import Base
+
+class FeedEntry(Base):
+    __tablename__ = 'feed_entries'
+    __table_args__ = (Index('ix_feed_entries_user_id_channel_id', 'user_id', 'channel_id'),
+                      Index('ix_feed_entries_post_id', 'post_id'))
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    created = Column(DateTime, primary_key=True)
+    post_id = Column(UUID(as_uuid=True), ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    channel_id = Column(UUID(as_uuid=True), ForeignKey('channels.id', ondelete='CASCADE'), nullable=False)
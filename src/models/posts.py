@@ -1,17 +1,25 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, Computed
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 import uuid
 from database.connection import Base
 
 class Post(Base):
     __tablename__ = 'posts'
+    __table_args__ = (Index('ix_posts_created_id', 'created', 'id'),
+                      Index('ix_posts_channel_id_created_id', 'channel_id', 'created', 'id'),
+                      Index('ix_posts_search_vector', 'search_vector', postgresql_using='gin'))
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(32), nullable=False)
     description = Column(String(64), nullable=False)
     created = Column(DateTime, server_default=func.now())
     updated = Column(DateTime, onupdate=func.now())
-    channel_id = Column(UUID(as_uuid=True), ForeignKey('channels.id'))
-    comments = relationship('Comment', backref='post', cascade="all, delete-orphan", lazy='selectin')
+    likes_count = Column(Integer, nullable=False, default=0, server_default='0')
+    comments_count = Column(Integer, nullable=False, default=0, server_default='0')
+    channel_id = Column(UUID(as_uuid=True), ForeignKey('channels.id', ondelete='CASCADE'))
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('english', name || ' ' || description)",
+                                                       persisted=True)))
+    comments = relationship('Comment', backref='post', cascade="all, delete-orphan", passive_deletes=True,
+                            lazy='raise')
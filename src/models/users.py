@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Table, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
@@ -6,12 +6,17 @@ import uuid
 from database.connection import Base
 
 user_channel = Table('user_channel', Base.metadata,
-                    Column('user_id', UUID(as_uuid=True), ForeignKey('users.id')),
-                    Column('channel_id', UUID(as_uuid=True), ForeignKey('channels.id')))
+                    Column('user_id', UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+                    Column('channel_id', UUID(as_uuid=True), ForeignKey('channels.id', ondelete='CASCADE'),
+                           primary_key=True),
+                    Index('ix_user_channel_channel_id', 'channel_id'))
 
 user_post = Table('user_post', Base.metadata,
-                  Column('user_id', UUID(as_uuid=True), ForeignKey('users.id')),
-                  Column('post_id', UUID(as_uuid=True), ForeignKey('posts.id')))
+                  Column('user_id', UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+                  Column('post_id', UUID(as_uuid=True), ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True),
+                  Column('created', DateTime, server_default=func.now()),
+                  Index('ix_user_post_post_id', 'post_id'),
+                  Index('ix_user_post_created', 'created'))
 
 class User(Base):
     __tablename__ = 'users'
@@ -24,5 +29,5 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     following = relationship('Channel', secondary=user_channel, backref='followed', cascade='all, delete')
     likes = relationship('Post', secondary=user_post, backref='liked', cascade='all, delete')
-    channels = relationship('Channel', backref='user', cascade='all, delete-orphan')
-    comments = relationship('Comment', backref='user', cascade='all, delete-orphan')
+    channels = relationship('Channel', backref='user', cascade='all, delete-orphan', passive_deletes=True)
+    comments = relationship('Comment', backref='user', cascade='all, delete-orphan', passive_deletes=True)
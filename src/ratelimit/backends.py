@@ -0,0 +1,89 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Tuple
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def take(self, key: str, capacity: float, rate: float, cost: float = 1) -> Tuple[bool, float]:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+class MemoryBackend(RateLimitBackend):
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict = OrderedDict()
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            key, (tokens, stamp, idle) = next(iter(self._buckets.items()))
+            if stamp + idle > now and len(self._buckets) <= self.max_keys:
+                break
+            del self._buckets[key]
+
+    async def take(self, key: str, capacity: float, rate: float, cost: float = 1) -> Tuple[bool, float]:
+        now = time.monotonic()
+        bucket = self._buckets.pop(key, None)
+        tokens = capacity if bucket is None else min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now, (capacity - tokens) / rate)
+        self._evict(now)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    async def clear(self) -> None:
+        self._buckets.clear()
+
+    def stats(self) -> dict:
+        return {'backend': 'memory', 'keys': len(self._buckets), 'max_keys': self.max_keys}
+
+TAKE_SCRIPT = '''
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = capacity
+if bucket[1] then
+    tokens = math.min(capacity, tonumber(bucket[1]) + (now - tonumber(bucket[2])) * rate)
+end
+local allowed = tokens >= cost
+if allowed then
+    tokens = tokens - cost
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'stamp', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1)
+if allowed then
+    return {1, '0'}
+end
+return {0, tostring((cost - tokens) / rate)}
+'''
+
+class RedisBackend(RateLimitBackend):
+    def __init__(self, url: str, prefix: str = 'ratelimit:') -> None:
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError('RedisBackend requires the redis package')
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+        self._take = self.client.register_script(TAKE_SCRIPT)
+
+    async def take(self, key: str, capacity: float, rate: float, cost: float = 1) -> Tuple[bool, float]:
+        allowed, retry_after = await self._take(keys=[f'{self.prefix}{key}'], args=[capacity, rate, cost])
+        return bool(allowed), float(retry_after)
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f'{self.prefix}*'):
+            await self.client.delete(key)
+
+    def stats(self) -> dict:
+        return {'backend': 'redis'}
@@ -0,0 +1,97 @@
+import math
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+from auth.jwt_handler import verify_access_token
+from .backends import RateLimitBackend, MemoryBackend, RedisBackend
+
+RATE_LIMIT: bool = os.getenv('RATE_LIMIT', 'true').lower() in ('1', 'true', 'yes')
+RATE_LIMIT_BACKEND: str = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+RATE_LIMIT_URL: str = os.getenv('RATE_LIMIT_URL', 'redis://localhost:6379/1')
+RATE_LIMIT_MAX_KEYS: int = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
+
+class Policy(NamedTuple):
+    name: str
+    capacity: float
+    period: float
+    per_principal: bool = True
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+def policy(name: str, default: str, per_principal: bool = True) -> Policy:
+    capacity, period = os.getenv(f'RATE_LIMIT_{name.upper()}', default).split('/')
+    return Policy(name, float(capacity), float(period), per_principal)
+
+SIGNIN_POLICY = policy('signin', '10/60', per_principal=False)
+SIGNUP_POLICY = policy('signup', '5/300', per_principal=False)
+READ_POLICY = policy('read', '300/60')
+WRITE_POLICY = policy('write', '60/60')
+
+ROUTE_POLICIES: Dict[Tuple[str, str], Policy] = {
+    ('POST', '/users/signin'): SIGNIN_POLICY,
+    ('POST', '/users/signup'): SIGNUP_POLICY,
+}
+
+EXEMPT_PATHS = ('/metrics', '/health')
+
+def create_backend() -> RateLimitBackend:
+    if RATE_LIMIT_BACKEND == 'redis':
+        return RedisBackend(RATE_LIMIT_URL)
+    return MemoryBackend(RATE_LIMIT_MAX_KEYS)
+
+rate_limit_backend = create_backend()
+
+def client_identity(scope: Scope) -> str:
+    client = scope.get('client')
+    return f'ip:{client[0]}' if client else 'ip:unknown'
+
+def principal_identity(scope: Scope) -> Optional[str]:
+    scheme, _, token = Headers(scope=scope).get('authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    try:
+        data = verify_access_token(token)
+    except HTTPException:
+        return None
+    return f'user:{data.get("id") or data.get("user")}'
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, backend: RateLimitBackend = rate_limit_backend,
+                 policies: Dict[Tuple[str, str], Policy] = ROUTE_POLICIES, enabled: bool = RATE_LIMIT) -> None:
+        self.app = app
+        self.backend = backend
+        self.policies = policies
+        self.enabled = enabled
+        self._routes: Optional[List] = None
+
+    def route_policy(self, scope: Scope) -> Policy:
+        if self._routes is None:
+            self._routes = [route for route in scope['app'].routes
+                            if any(path == getattr(route, 'path', None) for _, path in self.policies)]
+        for route in self._routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                policy = self.policies.get((scope['method'], route.path))
+                if policy is not None:
+                    return policy
+        return READ_POLICY if scope['method'] in ('GET', 'HEAD', 'OPTIONS') else WRITE_POLICY
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope['type'] != 'http' or scope['path'].startswith(EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+        policy = self.route_policy(scope)
+        identity = (policy.per_principal and principal_identity(scope)) or client_identity(scope)
+        allowed, retry_after = await self.backend.take(f'{policy.name}:{identity}', policy.capacity, policy.rate)
+        if not allowed:
+            response = JSONResponse({'detail': 'Too many requests'}, status_code=429,
+                                    headers={'Retry-After': str(math.ceil(retry_after))})
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+import asyncpg
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import settings
+from metrics import registry
+
+REALTIME_CHANNEL: str = os.getenv('REALTIME_CHANNEL', 'events')
+REALTIME_QUEUE_SIZE: int = int(os.getenv('REALTIME_QUEUE_SIZE', 64))
+REALTIME_HEARTBEAT: float = float(os.getenv('REALTIME_HEARTBEAT', 15))
+REALTIME_MAX_TOPICS: int = int(os.getenv('REALTIME_MAX_TOPICS', 100))
+REALTIME_RECONNECT_DELAY: float = float(os.getenv('REALTIME_RECONNECT_DELAY', 1))
+
+OVERFLOW_FRAME = b'event: overflow\ndata: {}\n\n'
+
+logger = logging.getLogger(__name__)
+
+realtime_dropped = registry.counter('realtime_dropped_events_total', 'Events dropped for slow subscribers.')
+
+def topic(kind: str, id: UUID) -> str:
+    return f'{kind}:{id}'
+
+def event_payload(kind: str, id: UUID, event: str, data: dict) -> str:
+    return orjson.dumps({'topic': topic(kind, id), 'event': event, 'data': data}, default=str).decode()
+
+async def publish(session: AsyncSession, payloads: List[str]) -> None:
+    if payloads:
+        await session.execute(text('SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) '
+                                   'AS payload'), {'channel': REALTIME_CHANNEL, 'payloads': payloads})
+
+class Subscription:
+    __slots__ = ('topics', 'queue', 'dropped')
+
+    def __init__(self, topics: Tuple[str, ...], queue_size: int) -> None:
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def deliver(self, frame: bytes) -> None:
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            dropped = self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW_FRAME)
+            self.dropped += dropped
+            realtime_dropped.inc(amount=dropped)
+
+class Broker:
+    def __init__(self, dsn: str, channel: str = REALTIME_CHANNEL, queue_size: int = REALTIME_QUEUE_SIZE) -> None:
+        self.dsn = dsn
+        self.channel = channel
+        self.queue_size = queue_size
+        self.topics: Dict[str, Set[Subscription]] = {}
+        self.subscribers = 0
+        self.connected = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(tuple(set(topics)), self.queue_size)
+        for name in subscription.topics:
+            self.topics.setdefault(name, set()).add(subscription)
+        self.subscribers += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for name in subscription.topics:
+            subscribers = self.topics.get(name)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.topics[name]
+        self.subscribers -= 1
+
+    def dispatch(self, payload: str) -> None:
+        try:
+            message = orjson.loads(payload)
+            subscribers = self.topics.get(message['topic'])
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            return
+        if not subscribers:
+            return
+        frame = b'event: ' + message['event'].encode() + b'\ndata: ' + orjson.dumps(message['data']) + b'\n\n'
+        for subscription in subscribers:
+            subscription.deliver(frame)
+
+    def resync(self) -> None:
+        for subscription in set().union(*self.topics.values()):
+            subscription.deliver(OVERFLOW_FRAME)
+
+    def _notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        self.dispatch(payload)
+
+    async def run(self) -> None:
+        while True:
+            closed = asyncio.Event()
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as error:
+                logger.warning('Realtime LISTEN connection failed: %s', error)
+                await asyncio.sleep(REALTIME_RECONNECT_DELAY)
+                continue
+            try:
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(self.channel, self._notify)
+                self.resync()
+                self.connected.set()
+                await closed.wait()
+                logger.warning('Realtime LISTEN connection lost, reconnecting')
+            except (OSError, asyncpg.PostgresError) as error:
+                logger.warning('Realtime LISTEN failed: %s', error)
+            finally:
+                self.connected.clear()
+                if not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(REALTIME_RECONNECT_DELAY)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+broker = Broker(settings.url.set(drivername='postgresql').render_as_string(hide_password=False))
+
+registry.gauge('realtime_subscribers', 'Open realtime subscriptions.', function=lambda: broker.subscribers)
@@ -1,74 +1,186 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from typing import List
-from sqlalchemy import select, insert, update, delete, exists
-from auth.authenticate import authenticate
-from models.users import User, user_channel
+from typing import List, Optional, Union
+from sqlalchemy import select, insert, delete, exists, func
+from sqlalchemy.dialects import postgresql
+from auth.authenticate import authenticate, Principal
+from models.users import user_channel
 from models.channels import Channel
-from schemas.channels import ChannelIn, ChannelResponse, HTTP_200_SUCCESS, FOLLOW_200_SUCCESS, DELETE_200_SUCCESS, \
+from models.posts import Post
+from schemas.channels import ChannelIn, ChannelSummary, ChannelResponse, ChannelPage, HTTP_200_SUCCESS, FOLLOW_200_SUCCESS, DELETE_200_SUCCESS, \
     HTTP_404_NOT_FOUND, HTTP_406_NOT_ACCEPTABLE
+from schemas.posts import PostResponse, PostPage
+from schemas.bulk import BulkResponse, BULK_MAX_ITEMS
 from database.connection import get_session
+from database.replica import get_read_session, on_replica
+from database.pagination import paginate, paginate_json, DEFAULT_LIMIT, MAX_LIMIT
+from database.versions import entity_version, list_version
+from database.loading import expand_options, expand_paths
+from database.feed import backfill_feed, backfill_feeds, clear_feed, clear_feeds
+from database.counters import increment, increment_many
+from database.toggles import follow_buffer, WRITE_BEHIND
+from database.writes import update_owned, owns_channel
+from database.purge import channel_purger, visible
+from cache.responses import entity_key, generation, invalidate, load, store
+from cache.conditional import not_modified, conditional_response
 
 channel_router = APIRouter(tags=['Channels'])
 
-@channel_router.get('/', response_model=List[ChannelResponse])
-async def get_all_channels(session: AsyncSession = Depends(get_session)) -> List[ChannelResponse]:
-    results = await session.execute(select(Channel))
-    return list(results.scalars().all())
+CHANNEL_EXPAND = ('posts', 'posts.comments')
+POST_EXPAND = ('comments',)
 
-@channel_router.get('/{id}', response_model=ChannelResponse)
-async def get_channel(id: UUID, session: AsyncSession = Depends(get_session)) -> ChannelResponse:
-    result = await session.get(entity=Channel, ident=id)
-    return result
+@channel_router.get('/', response_model=ChannelPage, response_model_exclude_unset=True)
+async def get_all_channels(request: Request, limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                           after: Optional[str] = None,
+                           expand: Optional[str] = Query(None, description=', '.join(CHANNEL_EXPAND)),
+                           session: AsyncSession = Depends(get_read_session)) -> Union[dict, Response]:
+    if not expand:
+        version = await list_version(session, Channel, limit, after, visible(Channel))
+        return not_modified(request, version) or conditional_response(
+            request, await paginate_json(session, Channel, ChannelResponse, limit, after, visible(Channel)), version)
+    stmt = select(Channel).where(visible(Channel)).options(*expand_options(Channel, expand, CHANNEL_EXPAND))
+    return await paginate(session, stmt, Channel, limit, after)
+
+@channel_router.get('/{id}', response_model=ChannelResponse, response_model_exclude_unset=True)
+async def get_channel(request: Request, id: UUID,
+                      expand: Optional[str] = Query(None, description=', '.join(CHANNEL_EXPAND)),
+                      session: AsyncSession = Depends(get_read_session)) -> Response:
+    paths = expand_paths(expand, CHANNEL_EXPAND)
+    fill = None if on_replica(session) else generation()
+    version = await entity_version(session, Channel, id, paths, visible(Channel))
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Channel not found')
+    response = not_modified(request, *version)
+    if response is not None:
+        return response
+    variant = ','.join(paths)
+    content = await load('channel', id, variant, version[0])
+    if content is None:
+        result = await session.get(entity=Channel, ident=id, options=expand_options(Channel, expand, CHANNEL_EXPAND))
+        if result is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Channel not found')
+        tags = [entity_key('post', post.id) for post in result.posts] if variant else []
+        content = await store('channel', id, variant, version[0], ChannelResponse.from_orm(result), fill, tags)
+    return conditional_response(request, content, *version)
+
+@channel_router.get('/{id}/posts', response_model=PostPage, response_model_exclude_unset=True)
+async def get_channel_posts(request: Request, id: UUID, limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                            after: Optional[str] = None,
+                            expand: Optional[str] = Query(None, description=', '.join(POST_EXPAND)),
+                            session: AsyncSession = Depends(get_read_session)) -> Union[dict, Response]:
+    if not expand:
+        criteria = (Post.channel_id == id, visible(Post))
+        version = await list_version(session, Post, limit, after, *criteria)
+        return not_modified(request, version) or conditional_response(
+            request, await paginate_json(session, Post, PostResponse, limit, after, *criteria), version)
+    stmt = select(Post).where(Post.channel_id == id, visible(Post)).options(*expand_options(Post, expand, POST_EXPAND))
+    return await paginate(session, stmt, Post, limit, after)
 
 @channel_router.post('/', response_model=HTTP_200_SUCCESS)
-async def create_channel(channel: ChannelIn, user: str = Depends(authenticate), session: AsyncSession = Depends(
+async def create_channel(channel: ChannelIn, principal: Principal = Depends(authenticate), session: AsyncSession = Depends(
     get_session)) -> dict:
-    user_id = await session.execute(select(User.id).where(User.username == user))
-    await session.execute(insert(Channel).values(user_id=user_id.scalar(), **channel.dict()))
+    await session.execute(insert(Channel).values(user_id=principal.id, **channel.dict()))
     await session.commit()
     return {'message': 'Channel created successfully'}
 
 @channel_router.post('/follow/{id}', response_model=FOLLOW_200_SUCCESS,
-                     responses={status.HTTP_406_NOT_ACCEPTABLE: {'model': HTTP_406_NOT_ACCEPTABLE}})
-async def follow(id: UUID, user: str = Depends(authenticate), session: AsyncSession = Depends(
+                     responses={status.HTTP_404_NOT_FOUND: {'model': HTTP_404_NOT_FOUND},
+                                status.HTTP_406_NOT_ACCEPTABLE: {'model': HTTP_406_NOT_ACCEPTABLE}})
+async def follow(id: UUID, principal: Principal = Depends(authenticate), session: AsyncSession = Depends(
     get_session)) -> dict:
-    user_id = await session.execute(select(User.id).where(User.username == user))
-    user_id = user_id.scalar()
-    user_channel_id = await session.execute(select(Channel.user_id).where(Channel.id == id))
-    if user_id == user_channel_id.scalar():
+    user_id = principal.id
+    is_followed = exists().where(user_channel.c.user_id == user_id).where(user_channel.c.channel_id == id)
+    state = await session.execute(select(Channel.user_id, is_followed.label('followed')).where(Channel.id == id)
+                                  .where(visible(Channel)))
+    state = state.first()
+    if state is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Channel not found')
+    if user_id == state.user_id:
         raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail='You can`t follow your channels')
-    check = await session.execute(select(exists().where(user_channel.c.user_id == user_id).where(user_channel.c.channel_id == id)))
-    if check.scalar():
+    if WRITE_BEHIND:
+        followed = await follow_buffer.toggle(session, user_id, id)
+        if followed is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Channel not found')
+        return {'message': f'You {"followed" if followed else "unfollowed"} this channel successfully'}
+    if state.followed:
         await session.execute(delete(user_channel).where(user_channel.c.user_id == user_id).where(user_channel.c.channel_id == id))
+        await clear_feed(session, user_id, id)
+        await increment(session, Channel.followers_count, id, -1)
         await session.commit()
+        await invalidate('channel', id)
         return {'message': 'You unfollowed this channel successfully'}
     await session.execute(insert(user_channel).values(user_id=user_id, channel_id=id))
+    await increment(session, Channel.followers_count, id)
+    await backfill_feed(session, user_id, id)
     await session.commit()
+    await invalidate('channel', id)
     return {'message': 'You followed this channel successfully'}
 
-@channel_router.put('/{id}', response_model=ChannelResponse,
+@channel_router.post('/bulk/follow', response_model=BulkResponse)
+async def follow_channels(ids: List[UUID] = Body(..., min_items=1, max_items=BULK_MAX_ITEMS),
+                          principal: Principal = Depends(authenticate),
+                          session: AsyncSession = Depends(get_session)) -> dict:
+    followed = exists().where(user_channel.c.user_id == principal.id).where(user_channel.c.channel_id == Channel.id)
+    state = await session.execute(select(Channel.id, Channel.user_id, followed).where(Channel.id.in_(set(ids)))
+                                  .where(visible(Channel)))
+    state = state.all()
+    own = {id for id, user_id, _ in state if user_id == principal.id}
+    state = {id: is_followed for id, user_id, is_followed in state if user_id != principal.id}
+    unfollow = [id for id, is_followed in state.items() if is_followed]
+    follow = [id for id, is_followed in state.items() if not is_followed]
+    changed = {}
+    if unfollow:
+        unfollowed = await session.execute(delete(user_channel).where(user_channel.c.user_id == principal.id)
+                                           .where(user_channel.c.channel_id.in_(unfollow))
+                                           .returning(user_channel.c.channel_id))
+        unfollowed = unfollowed.scalars().all()
+        if unfollowed:
+            await clear_feeds(session, principal.id, unfollowed)
+        changed.update((id, -1) for id in unfollowed)
+    if follow:
+        followed = await session.execute(postgresql.insert(user_channel).values([
+            {'user_id': principal.id, 'channel_id': id} for id in follow
+        ]).on_conflict_do_nothing().returning(user_channel.c.channel_id))
+        followed = followed.scalars().all()
+        if followed:
+            await backfill_feeds(session, principal.id, followed)
+        changed.update((id, 1) for id in followed)
+    await increment_many(session, Channel.followers_count, changed)
+    await session.commit()
+    await invalidate('channel', *changed)
+    results, seen = [], set()
+    for index, id in enumerate(ids):
+        if id in own:
+            results.append({'index': index, 'status': 'error', 'id': id, 'detail': 'You can`t follow your channels'})
+        elif id not in state:
+            results.append({'index': index, 'status': 'error', 'id': id, 'detail': 'Channel not found'})
+        elif id in seen:
+            results.append({'index': index, 'status': 'error', 'id': id, 'detail': 'Duplicate item'})
+        elif id not in changed:
+            results.append({'index': index, 'status': 'error', 'id': id, 'detail': 'Concurrent update'})
+        else:
+            results.append({'index': index, 'status': 'followed' if changed[id] > 0 else 'unfollowed', 'id': id})
+        seen.add(id)
+    return {'results': results}
+
+@channel_router.put('/{id}', response_model=ChannelSummary,
                     responses={status.HTTP_404_NOT_FOUND: {'model': HTTP_404_NOT_FOUND}})
-async def update_channel(id: UUID, channel: ChannelIn, user: str = Depends(authenticate),
-                         session: AsyncSession = Depends(get_session)) -> ChannelResponse:
-    channel_user_id = await session.execute(select(Channel.user_id).where(Channel.id == id))
-    user_id = await session.execute(select(User.id).where(User.username == user))
-    if channel_user_id.scalar() != user_id.scalar():
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='User doesn`t have such a channel')
-    await session.execute(update(Channel).where(Channel.id == id).values(**channel.dict()))
+async def update_channel(id: UUID, channel: ChannelIn, principal: Principal = Depends(authenticate),
+                         session: AsyncSession = Depends(get_session)) -> ChannelSummary:
+    result = await update_owned(session, Channel, id, owns_channel(principal.id), channel.dict(),
+                                'User doesn`t have such a channel')
     await session.commit()
-    result = await session.get(entity=Channel, ident=id)
+    await invalidate('channel', id)
     return result
 
 @channel_router.delete('/{id}', response_model=DELETE_200_SUCCESS,
                        responses={status.HTTP_404_NOT_FOUND: {'model': HTTP_404_NOT_FOUND}})
-async def delete_channel(id: UUID, user: str = Depends(authenticate), session: AsyncSession = Depends(
+async def delete_channel(id: UUID, principal: Principal = Depends(authenticate), session: AsyncSession = Depends(
     get_session)) -> dict:
-    channel_user_id = await session.execute(select(Channel.user_id).where(Channel.id == id))
-    user_id = await session.execute(select(User.id).where(User.username == user))
-    if channel_user_id.scalar() != user_id.scalar():
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='User doesn`t have such a channel')
-    await session.execute(delete(Channel).where(Channel.id == id))
+    await update_owned(session, Channel, id, owns_channel(principal.id),
+                       {'deleted_at': func.now(), 'updated': Channel.updated}, 'User doesn`t have such a channel')
     await session.commit()
+    await invalidate('channel', id)
+    channel_purger.wake()
     return {'message': 'Channel deleted successfully'}
@@ -1,56 +1,110 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from uuid import UUID
-from typing import List
-from sqlalchemy import insert, update, delete
-from auth.authenticate import authenticate
-from models.users import User
+from collections import Counter
+from typing import List, Optional
+from sqlalchemy import insert, exists
+from auth.authenticate import authenticate, Principal
+from models.posts import Post
 from models.comments import Comment
-from schemas.comments import CommentIn, CommentResponse, HTTP_200_SUCCESS, DELETE_200_SUCCESS, HTTP_404_NOT_FOUND
+from schemas.comments import CommentIn, CommentBulkIn, CommentResponse, CommentPage, HTTP_200_SUCCESS, DELETE_200_SUCCESS, HTTP_404_NOT_FOUND
 from database.connection import get_session
+from database.replica import get_read_session, on_replica
+from database.pagination import paginate_json, DEFAULT_LIMIT, MAX_LIMIT
+from database.versions import entity_version, list_version
+from database.counters import increment, increment_many
+from database.writes import insert_owned, update_owned, delete_owned, owns_comment
+from database.purge import visible
+from schemas.bulk import BulkResponse, BULK_MAX_ITEMS
+from realtime.broker import publish, event_payload
+from cache.responses import generation, invalidate, load, store
+from cache.conditional import not_modified, conditional_response
 
 comment_router = APIRouter(tags=['Comments'])
 
-@comment_router.get('/', response_model=List[CommentResponse])
-async def get_all_comments(session: AsyncSession = Depends(get_session)) -> List[CommentResponse]:
-    results = await session.execute(select(Comment))
-    return list(results.scalars().all())
+@comment_router.get('/', response_model=CommentPage)
+async def get_all_comments(request: Request, limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                           after: Optional[str] = None,
+                           session: AsyncSession = Depends(get_read_session)) -> Response:
+    version = await list_version(session, Comment, limit, after, visible(Comment))
+    return not_modified(request, version) or conditional_response(
+        request, await paginate_json(session, Comment, CommentResponse, limit, after, visible(Comment)), version)
 
 @comment_router.get('/{id}', response_model=CommentResponse)
-async def get_comment(id: UUID, session: AsyncSession = Depends(get_session)) -> CommentResponse:
-    result = await session.get(entity=Comment, ident=id)
-    return result
+async def get_comment(request: Request, id: UUID, session: AsyncSession = Depends(get_read_session)) -> Response:
+    fill = None if on_replica(session) else generation()
+    version = await entity_version(session, Comment, id, (), visible(Comment))
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Comment not found')
+    response = not_modified(request, *version)
+    if response is not None:
+        return response
+    content = await load('comment', id, '', version[0])
+    if content is None:
+        result = await session.get(entity=Comment, ident=id)
+        if result is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Comment not found')
+        content = await store('comment', id, '', version[0], CommentResponse.from_orm(result), fill)
+    return conditional_response(request, content, *version)
+
+@comment_router.post('/bulk', response_model=BulkResponse)
+async def create_comments(comments: List[CommentBulkIn] = Body(..., min_items=1, max_items=BULK_MAX_ITEMS),
+                          principal: Principal = Depends(authenticate),
+                          session: AsyncSession = Depends(get_session)) -> dict:
+    found = await session.execute(select(Post.id).where(Post.id.in_({comment.post_id for comment in comments}))
+                                  .where(visible(Post)))
+    found = set(found.scalars().all())
+    accepted = [index for index, comment in enumerate(comments) if comment.post_id in found]
+    results = [{'index': index, 'status': 'error', 'detail': 'Post not found'} for index in range(len(comments))]
+    if accepted:
+        comment_ids = await session.execute(insert(Comment).values([
+            {'user_id': principal.id, **comments[index].dict()} for index in accepted
+        ]).returning(Comment.id))
+        comment_ids = comment_ids.scalars().all()
+        await increment_many(session, Post.comments_count, Counter(comments[index].post_id for index in accepted))
+        await publish(session, [event_payload('post', comments[index].post_id, 'comment.created',
+                                              {'id': comment_id, 'post_id': comments[index].post_id,
+                                               'user_id': principal.id})
+                                for index, comment_id in zip(accepted, comment_ids)])
+        await session.commit()
+        await invalidate('post', *found)
+        for index, comment_id in zip(accepted, comment_ids):
+            results[index] = {'index': index, 'status': 'created', 'id': comment_id}
+    return {'results': results}
 
-@comment_router.post('/{id}', response_model=HTTP_200_SUCCESS)
-async def create_comment(id: UUID, comment: CommentIn, user: str = Depends(
+@comment_router.post('/{id}', response_model=HTTP_200_SUCCESS,
+                     responses={status.HTTP_404_NOT_FOUND: {'model': HTTP_404_NOT_FOUND}})
+async def create_comment(id: UUID, comment: CommentIn, principal: Principal = Depends(
     authenticate), session: AsyncSession = Depends(get_session)) -> dict:
-    user_id = await session.execute(select(User.id).where(User.username == user))
-    await session.execute(insert(Comment).values(user_id=user_id.scalar(), post_id=id, **comment.dict()))
+    comment_id, = await insert_owned(session, Comment, {'user_id': principal.id, 'post_id': id, **comment.dict()},
+                                     exists().where(Post.id == id).where(visible(Post)), 'Post not found')
+    await increment(session, Post.comments_count, id)
+    await publish(session, [event_payload('post', id, 'comment.created',
+                                          {'id': comment_id, 'post_id': id, 'user_id': principal.id})])
     await session.commit()
+    await invalidate('post', id)
     return {'message': 'Comment created successfully'}
 
 @comment_router.put('/{id}', response_model=CommentResponse,
                     responses={status.HTTP_404_NOT_FOUND: {'model': HTTP_404_NOT_FOUND}})
-async def update_comment(id: UUID, comment: CommentIn, user: str = Depends(authenticate),
+async def update_comment(id: UUID, comment: CommentIn, principal: Principal = Depends(authenticate),
                          session: AsyncSession = Depends(get_session)) -> CommentResponse:
-    comment_user_id = await session.execute(select(Comment.user_id).where(Comment.id == id))
-    user_id = await session.execute(select(User.id).where(User.username == user))
-    if comment_user_id.scalar() != user_id.scalar():
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='User doesn`t have such a comment')
-    await session.execute(update(Comment).where(Comment.id == id).values(**comment.dict()))
+    result = await update_owned(session, Comment, id, owns_comment(principal.id), comment.dict(),
+                                'User doesn`t have such a comment')
     await session.commit()
-    result = await session.get(entity=Comment, ident=id)
+    await invalidate('comment', id)
+    await invalidate('post', result.post_id)
     return result
 
 @comment_router.delete('/{id}', response_model=DELETE_200_SUCCESS,
                        responses={status.HTTP_404_NOT_FOUND: {'model': HTTP_404_NOT_FOUND}})
-async def delete_comment(id: UUID, user: str = Depends(authenticate), session: AsyncSession = Depends(
+async def delete_comment(id: UUID, principal: Principal = Depends(authenticate), session: AsyncSession = Depends(
     get_session)) -> dict:
-    comment_user_id = await session.execute(select(Comment.user_id).where(Comment.id == id))
-    user_id = await session.execute(select(User.id).where(User.username == user))
-    if comment_user_id.scalar() != user_id.scalar():
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='User doesn`t have such a comment')
-    await session.execute(delete(Comment).where(Comment.id == id))
+    post_id, = await delete_owned(session, Comment, id, owns_comment(principal.id), 'User doesn`t have such a comment',
+                                  Comment.post_id)
+    await increment(session, Post.comments_count, post_id, -1)
     await session.commit()
+    await invalidate('comment', id)
+    await invalidate('post', post_id)
     return {'message': 'Comment deleted successfully'}
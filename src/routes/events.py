@@ -0,0 +1,33 @@
+import asyncio
+from typing import AsyncIterator, List
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from realtime.broker import broker, topic, Broker, Subscription, REALTIME_HEARTBEAT, REALTIME_MAX_TOPICS
+
+events_router = APIRouter(tags=['Events'])
+
+EVENT_STREAM = 'text/event-stream'
+
+async def event_stream(broker: Broker, subscription: Subscription,
+                       heartbeat: float = REALTIME_HEARTBEAT) -> AsyncIterator[bytes]:
+    try:
+        yield b'retry: 3000\n\n'
+        while True:
+            try:
+                yield await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b': keep-alive\n\n'
+    finally:
+        broker.unsubscribe(subscription)
+
+@events_router.get('', response_class=StreamingResponse, responses={200: {'content': {EVENT_STREAM: {}}}})
+async def subscribe(channel: List[UUID] = Query([]), post: List[UUID] = Query([])) -> StreamingResponse:
+    topics = [topic('channel', id) for id in channel] + [topic('post', id) for id in post]
+    if not topics:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Subscribe to at least one channel or post')
+    if len(topics) > REALTIME_MAX_TOPICS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f'Cannot subscribe to more than {REALTIME_MAX_TOPICS} topics')
+    return StreamingResponse(event_stream(broker, broker.subscribe(topics)), media_type=EVENT_STREAM,
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.replica import get_read_session
+from database.export import stream_ndjson, changed_since
+from database.purge import visible
+from models.posts import Post
+from models.comments import Comment
+from schemas.posts import PostSummary
+from schemas.comments import CommentResponse
+
+export_router = APIRouter(tags=['Export'])
+
+NDJSON = 'application/x-ndjson'
+
+@export_router.get('/posts', response_class=StreamingResponse, responses={200: {'content': {NDJSON: {}}}})
+async def export_posts(since: Optional[datetime] = Query(None, description='only rows created or updated since'),
+                       channel_id: Optional[UUID] = None,
+                       session: AsyncSession = Depends(get_read_session)) -> StreamingResponse:
+    criteria = [*changed_since(Post, since), visible(Post)]
+    if channel_id is not None:
+        criteria.append(Post.channel_id == channel_id)
+    return StreamingResponse(stream_ndjson(session, Post, PostSummary, *criteria), media_type=NDJSON)
+
+@export_router.get('/comments', response_class=StreamingResponse, responses={200: {'content': {NDJSON: {}}}})
+async def export_comments(since: Optional[datetime] = Query(None, description='only rows created or updated since'),
+                          post_id: Optional[UUID] = None,
+                          session: AsyncSession = Depends(get_read_session)) -> StreamingResponse:
+    criteria = [*changed_since(Comment, since), visible(Comment)]
+    if post_id is not None:
+        criteria.append(Comment.post_id == post_id)
+    return StreamingResponse(stream_ndjson(session, Comment, CommentResponse, *criteria), media_type=NDJSON)
@@ -0,0 +1,35 @@
+import time
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import get_session, engine, settings
+from schemas.health import DatabaseHealth, CacheHealth, HTTP_503_SERVICE_UNAVAILABLE
+from cache.responses import response_cache
+
+health_router = APIRouter(tags=['Health'])
+
+@health_router.get('/db', response_model=DatabaseHealth,
+                   responses={status.HTTP_503_SERVICE_UNAVAILABLE: {'model': HTTP_503_SERVICE_UNAVAILABLE}})
+async def database_health(session: AsyncSession = Depends(get_session)) -> dict:
+    start = time.perf_counter()
+    try:
+        await session.execute(text('SELECT 1'))
+    except (SQLAlchemyError, OSError):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail='Database is unavailable')
+    latency = time.perf_counter() - start
+    pool = engine.pool
+    return {
+        'status': 'ok',
+        'latency_ms': round(latency * 1000, 3),
+        'pool_size': pool.size(),
+        'max_connections': settings.max_connections,
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+        'saturation': round(pool.checkedout() / settings.max_connections, 3)
+    }
+
+@health_router.get('/cache', response_model=CacheHealth)
+async def cache_health() -> dict:
+    return response_cache.stats()
@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from metrics import registry
+
+metrics_router = APIRouter(tags=['Metrics'])
+
+@metrics_router.get('/metrics', response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
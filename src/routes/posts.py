@@ -1,82 +1,199 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from sqlalchemy import select, insert, update, delete, exists
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional, Union
+from sqlalchemy import select, insert, delete, exists
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from auth.authenticate import authenticate
+import orjson
+from auth.authenticate import authenticate, Principal
 from database.connection import get_session
-from models.users import User, user_post
+from database.replica import get_read_session, on_replica
+from database.pagination import paginate, paginate_json, DEFAULT_LIMIT, MAX_LIMIT
+from database.versions import entity_version, list_version
+from database.loading import expand_options, expand_paths
+from database.feed import fan_out_post, fan_out_posts
+from database.counters import increment, increment_many
+from database.trending import trending_index, TRENDING_SIZE
+from database.toggles import like_buffer, WRITE_BEHIND
+from database.writes import insert_owned, update_owned, delete_owned, owns_channel, owns_post
+from database.purge import visible
+from realtime.broker import publish, event_payload
+from cache.responses import generation, invalidate, json_response, load, store
+from cache.conditional import not_modified, conditional_response
+from models.users import user_post
 from models.channels import Channel
 from models.posts import Post
-from schemas.posts import PostResponse, PostIn, HTTP_200_SUCCESS, LIKE_200_SUCCESS, DELETE_200_SUCCESS, \
+from models.comments import Comment
+from schemas.posts import PostSummary, PostResponse, PostPage, TrendingPage, PostIn, PostBulkIn, HTTP_200_SUCCESS, LIKE_200_SUCCESS, DELETE_200_SUCCESS, \
     HTTP_404_NOT_FOUND
+from schemas.comments import CommentResponse, CommentPage
+from schemas.bulk import BulkResponse, BULK_MAX_ITEMS
 
 post_router = APIRouter(tags=['Posts'])
 
-@post_router.get('/', response_model=List[PostResponse])
-async def get_all_posts(session: AsyncSession = Depends(get_session)) -> List[PostResponse]:
-    results = await session.execute(select(Post))
-    return list(results.scalars().all())
+POST_EXPAND = ('comments',)
 
-@post_router.get('/{id}', response_model=PostResponse)
-async def get_post(id: UUID, session: AsyncSession = Depends(get_session)) -> PostResponse:
-    result = await session.get(entity=Post, ident=id)
-    return result
+@post_router.get('/', response_model=PostPage, response_model_exclude_unset=True)
+async def get_all_posts(request: Request, limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                        after: Optional[str] = None,
+                        expand: Optional[str] = Query(None, description=', '.join(POST_EXPAND)),
+                        session: AsyncSession = Depends(get_read_session)) -> Union[dict, Response]:
+    if not expand:
+        version = await list_version(session, Post, limit, after, visible(Post))
+        return not_modified(request, version) or conditional_response(
+            request, await paginate_json(session, Post, PostResponse, limit, after, visible(Post)), version)
+    stmt = select(Post).where(visible(Post)).options(*expand_options(Post, expand, POST_EXPAND))
+    return await paginate(session, stmt, Post, limit, after)
+
+@post_router.get('/trending', response_model=TrendingPage)
+async def get_trending_posts(limit: int = Query(min(DEFAULT_LIMIT, TRENDING_SIZE), ge=1, le=TRENDING_SIZE)) -> Response:
+    return json_response(orjson.dumps({'items': trending_index.top(limit)}, default=str))
+
+@post_router.get('/{id}', response_model=PostResponse, response_model_exclude_unset=True)
+async def get_post(request: Request, id: UUID, expand: Optional[str] = Query(None, description=', '.join(POST_EXPAND)),
+                   session: AsyncSession = Depends(get_read_session)) -> Response:
+    paths = expand_paths(expand, POST_EXPAND)
+    fill = None if on_replica(session) else generation()
+    version = await entity_version(session, Post, id, paths, visible(Post))
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Post not found')
+    response = not_modified(request, *version)
+    if response is not None:
+        return response
+    variant = ','.join(paths)
+    content = await load('post', id, variant, version[0])
+    if content is None:
+        result = await session.get(entity=Post, ident=id, options=expand_options(Post, expand, POST_EXPAND))
+        if result is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Post not found')
+        content = await store('post', id, variant, version[0], PostResponse.from_orm(result), fill)
+    return conditional_response(request, content, *version)
+
+@post_router.get('/{id}/comments', response_model=CommentPage)
+async def get_post_comments(request: Request, id: UUID, limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                            after: Optional[str] = None,
+                            session: AsyncSession = Depends(get_read_session)) -> Response:
+    criteria = (Comment.post_id == id, visible(Comment))
+    version = await list_version(session, Comment, limit, after, *criteria)
+    return not_modified(request, version) or conditional_response(
+        request, await paginate_json(session, Comment, CommentResponse, limit, after, *criteria), version)
+
+@post_router.post('/bulk', response_model=BulkResponse)
+async def create_posts(posts: List[PostBulkIn] = Body(..., min_items=1, max_items=BULK_MAX_ITEMS),
+                       principal: Principal = Depends(authenticate),
+                       session: AsyncSession = Depends(get_session)) -> dict:
+    owned = await session.execute(select(Channel.id).where(Channel.id.in_({post.channel_id for post in posts}))
+                                  .where(owns_channel(principal.id)))
+    owned = set(owned.scalars().all())
+    accepted = [index for index, post in enumerate(posts) if post.channel_id in owned]
+    results = [{'index': index, 'status': 'error', 'detail': 'You don`t have such a channel'}
+               for index in range(len(posts))]
+    if accepted:
+        post_ids = await session.execute(insert(Post).values([posts[index].dict() for index in accepted])
+                                         .returning(Post.id))
+        post_ids = post_ids.scalars().all()
+        await fan_out_posts(session, post_ids, owned)
+        await publish(session, [event_payload('channel', posts[index].channel_id, 'post.created',
+                                              {'id': post_id, 'channel_id': posts[index].channel_id})
+                                for index, post_id in zip(accepted, post_ids)])
+        await session.commit()
+        await invalidate('channel', *owned)
+        for index, post_id in zip(accepted, post_ids):
+            results[index] = {'index': index, 'status': 'created', 'id': post_id}
+    return {'results': results}
+
+@post_router.post('/bulk/like', response_model=BulkResponse)
+async def like_posts(ids: List[UUID] = Body(..., min_items=1, max_items=BULK_MAX_ITEMS),
+                     principal: Principal = Depends(authenticate),
+                     session: AsyncSession = Depends(get_session)) -> dict:
+    liked = exists().where(user_post.c.user_id == principal.id).where(user_post.c.post_id == Post.id)
+    state = await session.execute(select(Post.id, liked).where(Post.id.in_(set(ids))).where(visible(Post)))
+    state = dict(state.all())
+    unlike = [id for id, is_liked in state.items() if is_liked]
+    like = [id for id, is_liked in state.items() if not is_liked]
+    changed = {}
+    if unlike:
+        unliked = await session.execute(delete(user_post).where(user_post.c.user_id == principal.id)
+                                        .where(user_post.c.post_id.in_(unlike)).returning(user_post.c.post_id))
+        changed.update((id, -1) for id in unliked.scalars().all())
+    if like:
+        liked = await session.execute(postgresql.insert(user_post)
+                                      .values([{'user_id': principal.id, 'post_id': id} for id in like])
+                                      .on_conflict_do_nothing().returning(user_post.c.post_id))
+        changed.update((id, 1) for id in liked.scalars().all())
+    await increment_many(session, Post.likes_count, changed)
+    await session.commit()
+    await invalidate('post', *changed)
+    results, seen = [], set()
+    for index, id in enumerate(ids):
+        if id not in state:
+            results.append({'index': index, 'status': 'error', 'id': id, 'detail': 'Post not found'})
+        elif id in seen:
+            results.append({'index': index, 'status': 'error', 'id': id, 'detail': 'Duplicate item'})
+        elif id not in changed:
+            results.append({'index': index, 'status': 'error', 'id': id, 'detail': 'Concurrent update'})
+        else:
+            results.append({'index': index, 'status': 'liked' if changed[id] > 0 else 'unliked', 'id': id})
+        seen.add(id)
+    return {'results': results}
 
 @post_router.post('/{id}', response_model=HTTP_200_SUCCESS,
                   responses={status.HTTP_404_NOT_FOUND: {'model': HTTP_404_NOT_FOUND}})
-async def create_post(id: UUID, post: PostIn, user: str = Depends(authenticate), session: AsyncSession = Depends(
+async def create_post(id: UUID, post: PostIn, principal: Principal = Depends(authenticate), session: AsyncSession = Depends(
     get_session)) -> dict:
-    channel_user_id = await session.execute(select(Channel.user_id).where(Channel.id == id))
-    user_id = await session.execute(select(User.id).where(User.username == user))
-    if channel_user_id.scalar() != user_id.scalar():
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='You don`t have such a post')
-    await session.execute(insert(Post).values(channel_id=id, **post.dict()))
+    post_id, created = await insert_owned(session, Post, {'channel_id': id, **post.dict()},
+                                          exists().where(Channel.id == id).where(owns_channel(principal.id)),
+                                          'You don`t have such a post', Post.id, Post.created)
+    await fan_out_post(session, post_id, id, created)
+    await publish(session, [event_payload('channel', id, 'post.created', {'id': post_id, 'channel_id': id})])
     await session.commit()
+    await invalidate('channel', id)
     return {'message': 'Post created successfully'}
 
-@post_router.post('/like/{id}', response_model=LIKE_200_SUCCESS)
-async def like(id: UUID, user: str = Depends(authenticate), session: AsyncSession = Depends(
+@post_router.post('/like/{id}', response_model=LIKE_200_SUCCESS,
+                  responses={status.HTTP_404_NOT_FOUND: {'model': HTTP_404_NOT_FOUND}})
+async def like(id: UUID, principal: Principal = Depends(authenticate), session: AsyncSession = Depends(
     get_session)) -> dict:
-    user_id = await session.execute(select(User.id).where(User.username == user))
-    user_id = user_id.scalar()
+    user_id = principal.id
+    if WRITE_BEHIND:
+        liked = await like_buffer.toggle(session, user_id, id)
+        if liked is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Post not found')
+        return {'message': f'You {"liked" if liked else "unliked"} this post successfully'}
     check = await session.execute(
-        select(exists().where(user_post.c.user_id == user_id).where(user_post.c.post_id == id)))
-    if check.scalar():
+        select(exists().where(user_post.c.user_id == user_id).where(user_post.c.post_id == id))
+        .where(Post.id == id).where(visible(Post)))
+    liked = check.scalar()
+    if liked is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Post not found')
+    if liked:
         await session.execute(delete(user_post).where(user_post.c.user_id == user_id).where(user_post.c.post_id == id))
+        await increment(session, Post.likes_count, id, -1)
         await session.commit()
+        await invalidate('post', id)
         return {'message': 'You unliked this post successfully'}
     await session.execute(insert(user_post).values(user_id=user_id, post_id=id))
+    await increment(session, Post.likes_count, id)
     await session.commit()
+    await invalidate('post', id)
     return {'message': 'You liked this post successfully'}
 
-@post_router.put('/{id}', response_model=PostResponse,
+@post_router.put('/{id}', response_model=PostSummary,
                  responses={status.HTTP_404_NOT_FOUND: {'model': HTTP_404_NOT_FOUND}})
-async def update_post(id: UUID, post: PostIn, user: str = Depends(authenticate),
-                         session: AsyncSession = Depends(get_session)) -> PostResponse:
-    post_channel_id = await session.execute(select(Post.channel_id).where(Post.id == id))
-    post_channel_id = post_channel_id.scalar()
-    user_id = await session.execute(select(User.id).where(User.username == user))
-    channel_id = await session.execute(select(Channel.id).where(Channel.user_id == user_id.scalar()))
-    channel_id = channel_id.scalar()
-    if post_channel_id != channel_id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='You don`t have such a post')
-    await session.execute(update(Post).where(Post.id == id).values(**post.dict()))
+async def update_post(id: UUID, post: PostIn, principal: Principal = Depends(authenticate),
+                         session: AsyncSession = Depends(get_session)) -> PostSummary:
+    result = await update_owned(session, Post, id, owns_post(principal.id), post.dict(), 'You don`t have such a post')
     await session.commit()
-    result = await session.get(entity=Post, ident=id)
+    await invalidate('post', id)
     return result
 
 @post_router.delete('/{id}', response_model=DELETE_200_SUCCESS,
                     responses={status.HTTP_404_NOT_FOUND: {'model': HTTP_404_NOT_FOUND}})
-async def delete_post(id: UUID, user: str = Depends(authenticate), session: AsyncSession = Depends(
+async def delete_post(id: UUID, principal: Principal = Depends(authenticate), session: AsyncSession = Depends(
     get_session)) -> dict:
-    post_channel_id = await session.execute(select(Post.channel_id).where(Post.id == id))
-    post_channel_id = post_channel_id.scalar()
-    user_id = await session.execute(select(User.id).where(User.username == user))
-    channel_id = await session.execute(select(Channel.id).where(Channel.user_id == user_id.scalar()))
-    channel_id = channel_id.scalar()
-    if post_channel_id != channel_id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='You don`t have such a post')
-    await session.execute(delete(Post).where(Post.id == id))
+    channel_id, = await delete_owned(session, Post, id, owns_post(principal.id), 'You don`t have such a post',
+                                     Post.channel_id)
     await session.commit()
+    await invalidate('post', id)
+    await invalidate('channel', channel_id)
     return {'message': 'Post deleted successfully'}
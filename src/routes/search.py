@@ -0,0 +1,38 @@
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.replica import get_read_session
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT
+from database.search import search_json
+from database.purge import visible
+from cache.responses import json_response
+from models.channels import Channel
+from models.posts import Post
+from models.comments import Comment
+from schemas.search import PostSearchResult, PostSearchPage, CommentSearchResult, CommentSearchPage
+
+search_router = APIRouter(tags=['Search'])
+
+@search_router.get('/posts', response_model=PostSearchPage)
+async def search_posts(q: str = Query(..., min_length=1, max_length=256), channel_id: Optional[UUID] = None,
+                       author_id: Optional[UUID] = None, limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                       after: Optional[str] = None, session: AsyncSession = Depends(get_read_session)) -> Response:
+    criteria = [visible(Post)]
+    if channel_id is not None:
+        criteria.append(Post.channel_id == channel_id)
+    if author_id is not None:
+        criteria.append(Post.channel_id.in_(select(Channel.id).where(Channel.user_id == author_id)))
+    return json_response(await search_json(session, Post, PostSearchResult, q, limit, after, *criteria))
+
+@search_router.get('/comments', response_model=CommentSearchPage)
+async def search_comments(q: str = Query(..., min_length=1, max_length=256), channel_id: Optional[UUID] = None,
+                          author_id: Optional[UUID] = None, limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+                          after: Optional[str] = None, session: AsyncSession = Depends(get_read_session)) -> Response:
+    criteria = [visible(Comment)]
+    if channel_id is not None:
+        criteria.append(Comment.post_id.in_(select(Post.id).where(Post.channel_id == channel_id)))
+    if author_id is not None:
+        criteria.append(Comment.user_id == author_id)
+    return json_response(await search_json(session, Comment, CommentSearchResult, q, limit, after, *criteria))
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, insert, or_
+from typing import Optional
+from auth.authenticate import authenticate, Principal
 from auth.hash_password import HashPassword
 from auth.jwt_handler import create_access_token
 from models.users import User
 from schemas.users import UserIn, TokenResponse, HTTP_409_CONFLICT, HTTP_404_NOT_FOUND, HTTP_200_SUCCESS
+from schemas.posts import PostPage
 from database.connection import get_session
+from database.replica import get_read_session
+from database.pagination import DEFAULT_LIMIT, MAX_LIMIT
+from database.feed import read_feed
 
 hash_password = HashPassword()
 
@@ -19,7 +25,7 @@ async def sign_user_up(user: UserIn, session: AsyncSession = Depends(get_session
     user_exist = result.first()
     if user_exist:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='User with email provided exists already.')
-    hashed_password = hash_password.create_hash(user.password)
+    hashed_password = await hash_password.acreate_hash(user.password)
     new_user = user.dict()
     new_user['password'] = hashed_password
     await session.execute(insert(User).values(**new_user))
@@ -32,10 +38,16 @@ async def sign_user_in(user: OAuth2PasswordRequestForm = Depends(), session: Asy
     get_session)) -> dict:
     result = await session.execute(select(User).where(User.username == user.username))
     user_exist = result.scalar()
-    if user_exist and hash_password.verify_hash(user.password, user_exist.password):
-        access_token = create_access_token(user_exist.username)
+    if user_exist and await hash_password.averify_hash(user.password, user_exist.password):
+        access_token = create_access_token(user_exist.username, user_exist.id, user_exist.is_active)
         return {
             'access_token': access_token,
             'token_type': 'Bearer'
         }
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='User with such credentials does not exist')
+
+@user_router.get('/me/feed', response_model=PostPage, response_model_exclude_unset=True)
+async def get_feed(limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT), after: Optional[str] = None,
+                   principal: Principal = Depends(authenticate),
+                   session: AsyncSession = Depends(get_read_session)) -> dict:
+    return await read_feed(session, principal.id, limit, after)
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from uuid import UUID
+from typing import Optional, List
+
+BULK_MAX_ITEMS: int = 1000
+
+class BulkResult(BaseModel):
+    index: int
+    status: str
+    id: Optional[UUID]
+    detail: Optional[str]
+
+class BulkResponse(BaseModel):
+    results: List[BulkResult]
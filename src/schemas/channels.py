@@ -3,6 +3,7 @@ from uuid import UUID
 from datetime import datetime
 from typing import Optional, List
 from schemas.posts import PostResponse
+from schemas.orm import LoadedGetterDict
 
 class ChannelIn(BaseModel):
     name: str
@@ -12,13 +13,21 @@ class ChannelIn(BaseModel):
     class Config:
         arbitrary_types_allowed = True
         orm_mode = True
+        getter_dict = LoadedGetterDict
 
-class ChannelResponse(ChannelIn):
+class ChannelSummary(ChannelIn):
     id: UUID
     created: datetime
     updated: Optional[datetime]
     user_id: UUID
-    posts: List[PostResponse]
+    followers_count: int
+
+class ChannelResponse(ChannelSummary):
+    posts: Optional[List[PostResponse]]
+
+class ChannelPage(BaseModel):
+    items: List[ChannelResponse]
+    next_cursor: Optional[str]
 
 class HTTP_200_SUCCESS(BaseModel):
     message: str = 'Channel created successfully'
@@ -1,7 +1,8 @@
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
+from schemas.orm import LoadedGetterDict
 
 class CommentIn(BaseModel):
     description: str
@@ -9,6 +10,10 @@ class CommentIn(BaseModel):
     class Config:
         arbitrary_types_allowed = True
         orm_mode = True
+        getter_dict = LoadedGetterDict
+
+class CommentBulkIn(CommentIn):
+    post_id: UUID
 
 class CommentResponse(CommentIn):
     id: UUID
@@ -17,6 +22,9 @@ class CommentResponse(CommentIn):
     user_id: UUID
     post_id: UUID
 
+class CommentPage(BaseModel):
+    items: List[CommentResponse]
+    next_cursor: Optional[str]
 
 class HTTP_200_SUCCESS(BaseModel):
     message: str = 'Comment created successfully'
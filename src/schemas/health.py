@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class DatabaseHealth(BaseModel):
+    status: str
+    latency_ms: float
+    pool_size: int
+    max_connections: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    saturation: float
+
+class CacheHealth(BaseModel):
+    backend: str
+    hits: int
+    misses: int
+    hit_ratio: float
+    entries: Optional[int]
+    bytes: Optional[int]
+    max_bytes: Optional[int]
+
+class HTTP_503_SERVICE_UNAVAILABLE(BaseModel):
+    detail: str = 'Database is unavailable'
@@ -0,0 +1,10 @@
+from typing import Any
+from pydantic.utils import GetterDict
+from sqlalchemy import inspect
+
+class LoadedGetterDict(GetterDict):
+    def get(self, key: Any, default: Any = None) -> Any:
+        state = inspect(self._obj, raiseerr=False)
+        if state is not None and key in state.unloaded:
+            return default
+        return getattr(self._obj, key, default)
@@ -3,6 +3,7 @@ from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
 from schemas.comments import CommentResponse
+from schemas.orm import LoadedGetterDict
 
 class PostIn(BaseModel):
     name: str
@@ -11,12 +12,31 @@ class PostIn(BaseModel):
     class Config:
         arbitrary_types_allowed = True
         orm_mode = True
+        getter_dict = LoadedGetterDict
 
-class PostResponse(PostIn):
+class PostBulkIn(PostIn):
+    channel_id: UUID
+
+class PostSummary(PostIn):
     id: UUID
     created: datetime
     updated: Optional[datetime]
-    comments: List[CommentResponse]
+    channel_id: UUID
+    likes_count: int
+    comments_count: int
+
+class PostResponse(PostSummary):
+    comments: Optional[List[CommentResponse]]
+
+class PostPage(BaseModel):
+    items: List[PostResponse]
+    next_cursor: Optional[str]
+
+class TrendingPost(PostSummary):
+    score: float
+
+class TrendingPage(BaseModel):
+    items: List[TrendingPost]
 
 class HTTP_200_SUCCESS(BaseModel):
     message: str = 'Post created successfully'
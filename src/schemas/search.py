@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from schemas.posts import PostSummary
+from schemas.comments import CommentResponse
+
+class PostSearchResult(PostSummary):
+    rank: float
+
+class CommentSearchResult(CommentResponse):
+    rank: float
+
+class PostSearchPage(BaseModel):
+    items: List[PostSearchResult]
+    next_cursor: Optional[str]
+
+class CommentSearchPage(BaseModel):
+    items: List[CommentSearchResult]
+    next_cursor: Optional[str]
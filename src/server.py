@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+import socket
+from typing import List, Optional
+import uvicorn
+from alembic import command
+from alembic.config import Config
+from dotenv import load_dotenv
+from uvicorn.supervisors import ChangeReload, Multiprocess
+from database.settings import DatabaseSettings
+
+SERVER_HOST: str = os.getenv('SERVER_HOST', '0.0.0.0')
+SERVER_PORT: int = int(os.getenv('SERVER_PORT', 8000))
+SERVER_WORKERS: int = int(os.getenv('WEB_CONCURRENCY', os.cpu_count() or 1))
+SERVER_LOOP: str = os.getenv('SERVER_LOOP', 'auto')
+SERVER_HTTP: str = os.getenv('SERVER_HTTP', 'auto')
+SERVER_KEEP_ALIVE: int = int(os.getenv('SERVER_KEEP_ALIVE', 5))
+SERVER_BACKLOG: int = int(os.getenv('SERVER_BACKLOG', 2048))
+SERVER_LIMIT_CONCURRENCY: Optional[int] = int(os.getenv('SERVER_LIMIT_CONCURRENCY', 0)) or None
+SERVER_LIMIT_MAX_REQUESTS: Optional[int] = int(os.getenv('SERVER_LIMIT_MAX_REQUESTS', 0)) or None
+SERVER_GRACEFUL_TIMEOUT: float = float(os.getenv('SERVER_GRACEFUL_TIMEOUT', 30))
+SERVER_FORWARDED_ALLOW_IPS: str = os.getenv('FORWARDED_ALLOW_IPS', '127.0.0.1')
+SERVER_RELOAD: bool = os.getenv('SERVER_RELOAD', 'false').lower() in ('1', 'true', 'yes')
+SERVER_MIGRATE: bool = os.getenv('SERVER_MIGRATE', 'true').lower() in ('1', 'true', 'yes')
+
+ALEMBIC_CONFIG: str = os.getenv('ALEMBIC_CONFIG',
+                                os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'alembic.ini'))
+
+logger = logging.getLogger(__name__)
+
+class Server(uvicorn.Server):
+    def __init__(self, config: uvicorn.Config, graceful_timeout: float = SERVER_GRACEFUL_TIMEOUT) -> None:
+        super().__init__(config)
+        self.graceful_timeout = graceful_timeout
+
+    async def drain_deadline(self) -> None:
+        await asyncio.sleep(self.graceful_timeout)
+        for connection in list(self.server_state.connections):
+            connection.transport.close()
+        await asyncio.sleep(1)
+        for task in list(self.server_state.tasks):
+            task.cancel()
+
+    async def shutdown(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        deadline = asyncio.create_task(self.drain_deadline())
+        try:
+            await super().shutdown(sockets)
+        finally:
+            deadline.cancel()
+
+def migrate() -> None:
+    command.upgrade(Config(ALEMBIC_CONFIG), 'head')
+
+def build_config(**overrides) -> uvicorn.Config:
+    options = {
+        'host': SERVER_HOST,
+        'port': SERVER_PORT,
+        'workers': 1 if SERVER_RELOAD else SERVER_WORKERS,
+        'loop': SERVER_LOOP,
+        'http': SERVER_HTTP,
+        'timeout_keep_alive': SERVER_KEEP_ALIVE,
+        'backlog': SERVER_BACKLOG,
+        'limit_concurrency': SERVER_LIMIT_CONCURRENCY,
+        'limit_max_requests': SERVER_LIMIT_MAX_REQUESTS,
+        'proxy_headers': True,
+        'forwarded_allow_ips': SERVER_FORWARDED_ALLOW_IPS,
+        'reload': SERVER_RELOAD,
+        'lifespan': 'on',
+    }
+    options.update(overrides)
+    return uvicorn.Config('main:app', **options)
+
+def check_shared_state(workers: int) -> None:
+    load_dotenv()
+    settings = DatabaseSettings()
+    if workers > 1 and settings.replica_url and settings.db_read_your_writes_backend == 'memory':
+        logger.warning('Recent writes are tracked per worker; set DB_READ_YOUR_WRITES_BACKEND=redis '
+                       'so %d workers keep read-your-writes', workers)
+
+def run(config: Optional[uvicorn.Config] = None, migrations: bool = SERVER_MIGRATE) -> None:
+    if migrations:
+        migrate()
+    config = config or build_config()
+    server = Server(config)
+    if config.should_reload:
+        ChangeReload(config, target=server.run, sockets=[config.bind_socket()]).run()
+    elif config.workers > 1:
+        check_shared_state(config.workers)
+        Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+
+if __name__ == '__main__':
+    run()
@@ -6,12 +6,17 @@ from dotenv import load_dotenv
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from main import app
 from database.connection import Base, get_session
+from database.replica import get_read_session
+from cache.responses import response_cache
+from ratelimit.limiter import rate_limit_backend
+from metrics.database import instrument_engine
 
 load_dotenv()
 
 DATABASE_URL_TEST: str = f'postgresql+asyncpg://{os.getenv("POSTGRES_USER")}:{os.getenv("POSTGRES_PASSWORD")}@db:5432/test'
 
 engine_test = create_async_engine(DATABASE_URL_TEST, echo=True)
+instrument_engine(engine_test, 'test')
 async_session_test = async_sessionmaker(engine_test, class_=AsyncSession, expire_on_commit=False)
 Base.metadata.bind = engine_test
 
@@ -20,6 +25,7 @@ async def override_get_session() -> AsyncSession:
         yield session
 
 app.dependency_overrides[get_session] = override_get_session
+app.dependency_overrides[get_read_session] = override_get_session
 
 @pytest.fixture(autouse=True, scope='session')
 async def init_db() -> None:
@@ -29,6 +35,14 @@ async def init_db() -> None:
     async with engine_test.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
+@pytest.fixture(autouse=True)
+async def clear_response_cache() -> None:
+    await response_cache.clear()
+
+@pytest.fixture(autouse=True)
+async def clear_rate_limits() -> None:
+    await rate_limit_backend.clear()
+
 @pytest.fixture(scope='session')
 def event_loop():
     loop = asyncio.get_event_loop_policy().new_event_loop()
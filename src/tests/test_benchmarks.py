@@ -0,0 +1,16 @@
+from benchmarks.stats import compare, percentile, summarize
+
+def test_percentile() -> None:
+    samples = [index / 1000 for index in range(1, 101)]
+    assert percentile(samples, 50) == 0.05
+    assert percentile(samples, 99) == 0.099
+    assert percentile([], 95) == 0.0
+
+def test_compare_flags_regressions() -> None:
+    baseline = {'feed': {'GET /users/me/feed': summarize([0.01] * 100, 0, 1)}}
+    faster = {'feed': {'GET /users/me/feed': summarize([0.009] * 100, 0, 1)}}
+    slower = {'feed': {'GET /users/me/feed': summarize([0.02] * 50, 0, 1)}}
+    assert compare(faster, baseline, 0.2) == []
+    regressions = compare(slower, baseline, 0.2)
+    assert any('p95_ms' in regression for regression in regressions)
+    assert any('throughput' in regression for regression in regressions)
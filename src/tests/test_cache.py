@@ -0,0 +1,43 @@
+from cache.backends import MemoryBackend
+from cache.responses import response_cache, generation, invalidate, load, store
+from schemas.users import UserIn
+
+async def test_memory_backend_invalidates_by_tag() -> None:
+    backend = MemoryBackend(max_bytes=1024, ttl=60)
+    await backend.set('channel:1', 'posts', b'{"posts": []}', tags=['post:1'])
+    await backend.set('channel:1', '', b'{}')
+    await backend.invalidate('post:1')
+    assert await backend.get('channel:1', 'posts') is None
+    assert await backend.get('channel:1', '') == b'{}'
+    await backend.invalidate('channel:1')
+    assert await backend.get('channel:1', '') is None
+    assert backend.bytes == 0
+
+async def test_memory_backend_evicts_least_recently_used() -> None:
+    backend = MemoryBackend(max_bytes=8, ttl=60)
+    await backend.set('post:1', '', b'1111')
+    await backend.set('post:2', '', b'2222')
+    assert await backend.get('post:1', '') == b'1111'
+    await backend.set('post:3', '', b'3333')
+    assert await backend.get('post:2', '') is None
+    assert await backend.get('post:1', '') == b'1111'
+    assert backend.stats()['entries'] == 2
+
+async def test_memory_backend_expires_entries() -> None:
+    backend = MemoryBackend(max_bytes=1024, ttl=0)
+    await backend.set('comment:1', '', b'{}')
+    assert await backend.get('comment:1', '') is None
+    assert backend.stats()['bytes'] == 0
+
+async def test_store_skips_fill_that_raced_an_invalidate() -> None:
+    model = UserIn(username='cached', email='cached@gmail.com', password='x')
+    fill = generation()
+    await invalidate('post', '1')
+    await store('post', '1', '', 'v1', model, fill)
+    assert await load('post', '1', '', 'v1') is None
+    await store('post', '1', '', 'v1', model, None)
+    assert await load('post', '1', '', 'v1') is None
+    await store('post', '1', '', 'v1', model, generation())
+    assert await load('post', '1', '', 'v1') == model.json(exclude_unset=True).encode()
+    assert await load('post', '1', '', 'v2') is None
+    await response_cache.clear()
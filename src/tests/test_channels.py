@@ -1,3 +1,4 @@
+import uuid
 import httpx
 import pytest
 from sqlalchemy import select, insert
@@ -13,11 +14,15 @@ hash_password = HashPassword()
 
 @pytest.fixture(scope='module')
 async def access_token() -> str:
-    return create_access_token('test_user')
+    async with async_session_test() as session:
+        user_id = await session.execute(select(User.id).where(User.username == 'test_user'))
+        return create_access_token('test_user', user_id.scalar())
 
 @pytest.fixture(scope='module')
 async def access_token_other_user() -> str:
-    return create_access_token('kirill')
+    async with async_session_test() as session:
+        user_id = await session.execute(select(User.id).where(User.username == 'kirill'))
+        return create_access_token('kirill', user_id.scalar())
 
 @pytest.fixture(autouse=True, scope='module')
 async def mock_data() -> None:
@@ -42,7 +47,12 @@ async def mock_data() -> None:
 async def test_channel_get_all(default_client: httpx.AsyncClient) -> None:
     response = await default_client.get('/channels/')
     assert response.status_code == 200
-    assert response.json()[0]['name'] == 'test_channel'
+    assert response.json()['items'][0]['name'] == 'test_channel'
+
+async def test_channel_get_all_invalid_cursor(default_client: httpx.AsyncClient) -> None:
+    response = await default_client.get('/channels/', params={'after': 'not-a-cursor'})
+    assert response.status_code == 400
+    assert response.json() == {'detail': 'Invalid cursor'}
 
 async def test_channel_get_by_id(default_client: httpx.AsyncClient) -> None:
     async with async_session_test() as session:
@@ -51,6 +61,31 @@ async def test_channel_get_by_id(default_client: httpx.AsyncClient) -> None:
         assert response.status_code == 200
         assert response.json()['name'] == 'test_channel'
 
+async def test_channel_get_by_id_shallow(default_client: httpx.AsyncClient) -> None:
+    async with async_session_test() as session:
+        id = await session.execute(select(Channel.id).where(Channel.name == 'test_channel'))
+        id = id.scalar()
+        response = await default_client.get(f'/channels/{id}')
+        assert response.status_code == 200
+        assert 'posts' not in response.json()
+        response = await default_client.get(f'/channels/{id}', params={'expand': 'posts,posts.comments'})
+        assert response.status_code == 200
+        assert response.json()['posts'] == []
+
+async def test_channel_get_by_id_unknown_expand(default_client: httpx.AsyncClient) -> None:
+    async with async_session_test() as session:
+        id = await session.execute(select(Channel.id).where(Channel.name == 'test_channel'))
+        response = await default_client.get(f'/channels/{id.scalar()}', params={'expand': 'followers'})
+        assert response.status_code == 400
+        assert response.json() == {'detail': 'Cannot expand followers'}
+
+async def test_channel_get_posts(default_client: httpx.AsyncClient) -> None:
+    async with async_session_test() as session:
+        id = await session.execute(select(Channel.id).where(Channel.name == 'test_channel'))
+        response = await default_client.get(f'/channels/{id.scalar()}/posts')
+        assert response.status_code == 200
+        assert response.json() == {'items': [], 'next_cursor': None}
+
 async def test_channel_create(default_client: httpx.AsyncClient, access_token: str) -> None:
     payload = {
         'name': 'new_test_channel',
@@ -119,6 +154,16 @@ async def test_channel_unfollow(default_client: httpx.AsyncClient, access_token_
         assert response.status_code == 200
         assert response.json() == test_response
 
+async def test_channel_follow_missing(default_client: httpx.AsyncClient, access_token: str, monkeypatch) -> None:
+    monkeypatch.setattr('routes.channels.WRITE_BEHIND', False)
+    headers = {
+        'accept': 'application/json',
+        'authorization': f'Bearer {access_token}'
+    }
+    response = await default_client.post(f'/channels/follow/{uuid.uuid4()}', headers=headers)
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'Channel not found'}
+
 async def test_channel_follow_own(default_client: httpx.AsyncClient, access_token: str) -> None:
     async with async_session_test() as session:
         id = await session.execute(select(Channel.id))
@@ -133,6 +178,21 @@ async def test_channel_follow_own(default_client: httpx.AsyncClient, access_toke
         assert response.status_code == 406
         assert response.json() == test_response
 
+async def test_channel_follow_bulk(default_client: httpx.AsyncClient, access_token: str) -> None:
+    async with async_session_test() as session:
+        own_id = await session.execute(select(Channel.id).where(Channel.name == 'test_channel'))
+        headers = {
+            'accept': 'application/json',
+            'content-type': 'application/json',
+            'authorization': f'Bearer {access_token}'
+        }
+        payload = [str(own_id.scalar()), '00000000-0000-0000-0000-000000000000']
+        response = await default_client.post('/channels/bulk/follow', json=payload, headers=headers)
+        assert response.status_code == 200
+        assert [result['detail'] for result in response.json()['results']] == [
+            'You can`t follow your channels', 'Channel not found'
+        ]
+
 async def test_channel_update(default_client: httpx.AsyncClient, access_token: str) -> None:
     async with async_session_test() as session:
         id = await session.execute(select(Channel.id))
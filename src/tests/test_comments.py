@@ -17,11 +17,15 @@ hash_password = HashPassword()
 
 @pytest.fixture(scope='module')
 async def access_token() -> str:
-    return create_access_token('user1')
+    async with async_session_test() as session:
+        user_id = await session.execute(select(User.id).where(User.username == 'user1'))
+        return create_access_token('user1', user_id.scalar())
 
 @pytest.fixture(scope='module')
 async def access_token_other_user() -> str:
-    return create_access_token('user2')
+    async with async_session_test() as session:
+        user_id = await session.execute(select(User.id).where(User.username == 'user2'))
+        return create_access_token('user2', user_id.scalar())
 
 @pytest.fixture(autouse=True, scope='module')
 async def mock_data() -> None:
@@ -55,7 +59,7 @@ async def mock_data() -> None:
 async def test_comment_get_all(default_client: httpx.AsyncClient) -> None:
     response = await default_client.get('/comments/')
     assert response.status_code == 200
-    assert response.json()[0]['description'] == 'comment'
+    assert response.json()['items'][0]['description'] == 'comment'
 
 async def test_comment_get_by_id(default_client: httpx.AsyncClient) -> None:
     async with async_session_test() as session:
@@ -82,6 +86,28 @@ async def test_comment_create(default_client: httpx.AsyncClient, access_token: s
         assert response.status_code == 200
         assert response.json() == test_response
 
+async def test_comment_create_bulk(default_client: httpx.AsyncClient, access_token: str) -> None:
+    async with async_session_test() as session:
+        id = await session.execute(select(Post.id).where(Post.name == 'post'))
+        id = id.scalar()
+        count = await session.execute(select(Post.comments_count).where(Post.id == id))
+        count = count.scalar()
+        payload = [
+            {'post_id': str(id), 'description': 'bulk_comment_1'},
+            {'post_id': '00000000-0000-0000-0000-000000000000', 'description': 'bulk_comment_2'},
+            {'post_id': str(id), 'description': 'bulk_comment_3'}
+        ]
+        headers = {
+            'accept': 'application/json',
+            'content-type': 'application/json',
+            'authorization': f'Bearer {access_token}'
+        }
+        response = await default_client.post('/comments/bulk', json=payload, headers=headers)
+        assert response.status_code == 200
+        assert [result['status'] for result in response.json()['results']] == ['created', 'error', 'created']
+        response = await default_client.get(f'/posts/{id}')
+        assert response.json()['comments_count'] == count + 2
+
 async def test_comment_update(default_client: httpx.AsyncClient, access_token: str) -> None:
     async with async_session_test() as session:
         id = await session.execute(select(Comment.id))
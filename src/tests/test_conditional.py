@@ -0,0 +1,82 @@
+import httpx
+import pytest
+from sqlalchemy import insert, update, delete
+from .conftest import async_session_test
+from database.counters import increment
+from models.users import User
+from models.channels import Channel
+from models.posts import Post
+from models.comments import Comment
+
+@pytest.fixture(autouse=True, scope='module')
+async def mock_data() -> dict:
+    async with async_session_test() as session:
+        user_id = await session.execute(insert(User).values(username='conditional', password='x',
+                                                            email='conditional@gmail.com').returning(User.id))
+        user_id = user_id.scalar()
+        channel_id = await session.execute(insert(Channel).values(name='conditional_channel', user_id=user_id)
+                                           .returning(Channel.id))
+        channel_id = channel_id.scalar()
+        post_id = await session.execute(insert(Post).values(name='conditional', description='conditional_desc',
+                                                            channel_id=channel_id).returning(Post.id))
+        post_id = post_id.scalar()
+        await session.commit()
+    yield {'user': user_id, 'channel': channel_id, 'post': post_id}
+    async with async_session_test() as session:
+        await session.execute(delete(Comment).where(Comment.post_id == post_id))
+        await session.execute(delete(Post).where(Post.id == post_id))
+        await session.execute(delete(Channel).where(Channel.id == channel_id))
+        await session.execute(delete(User).where(User.id == user_id))
+        await session.commit()
+
+async def test_post_not_modified(default_client: httpx.AsyncClient, mock_data: dict) -> None:
+    url = f'/posts/{mock_data["post"]}'
+    response = await default_client.get(url)
+    etag = response.headers['etag']
+    assert response.status_code == 200 and response.headers['last-modified']
+    cached = await default_client.get(url, headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.content == b''
+    assert cached.headers['etag'] == etag
+    since = await default_client.get(url, headers={'If-Modified-Since': response.headers['last-modified']})
+    assert since.status_code == 304
+    expanded = await default_client.get(url, params={'expand': 'comments'}, headers={'If-None-Match': etag})
+    assert expanded.status_code == 200
+    assert expanded.headers['etag'] != etag
+
+async def test_etag_tracks_counters_and_children(default_client: httpx.AsyncClient, mock_data: dict) -> None:
+    url = f'/posts/{mock_data["post"]}'
+    etag = (await default_client.get(url)).headers['etag']
+    expanded = (await default_client.get(url, params={'expand': 'comments'})).headers['etag']
+    async with async_session_test() as session:
+        await increment(session, Post.likes_count, mock_data['post'])
+        await session.commit()
+    response = await default_client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
+    assert response.json()['likes_count'] == 1
+    assert (await default_client.get(url, headers={'If-None-Match': response.headers['etag']})).status_code == 304
+    async with async_session_test() as session:
+        await session.execute(insert(Comment).values(description='fresh', user_id=mock_data['user'],
+                                                     post_id=mock_data['post']))
+        await session.commit()
+    assert (await default_client.get(url, params={'expand': 'comments'},
+                                     headers={'If-None-Match': expanded})).status_code == 200
+
+async def test_list_not_modified(default_client: httpx.AsyncClient, mock_data: dict) -> None:
+    url = f'/channels/{mock_data["channel"]}/posts'
+    response = await default_client.get(url)
+    etag = response.headers['etag']
+    assert 'last-modified' not in response.headers
+    assert (await default_client.get(url, headers={'If-None-Match': etag})).status_code == 304
+    assert (await default_client.get(url, params={'limit': 1}, headers={'If-None-Match': etag})).status_code == 200
+    async with async_session_test() as session:
+        await session.execute(update(Post).where(Post.id == mock_data['post']).values(name='edited'))
+        await session.commit()
+    response = await default_client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json()['items'][0]['name'] == 'edited'
+
+async def test_missing_entity(default_client: httpx.AsyncClient) -> None:
+    response = await default_client.get('/comments/00000000-0000-0000-0000-000000000000')
+    assert response.status_code == 404
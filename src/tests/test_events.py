@@ -0,0 +1,98 @@
+import asyncio
+import httpx
+import pytest
+from sqlalchemy import insert, delete, text
+from .conftest import async_session_test, DATABASE_URL_TEST
+from auth.jwt_handler import create_access_token
+from models.users import User
+from models.channels import Channel
+from models.posts import Post
+from realtime.broker import Broker, event_payload, topic, publish, OVERFLOW_FRAME
+from routes.events import event_stream
+
+@pytest.fixture(scope='module')
+async def mock_data() -> dict:
+    async with async_session_test() as session:
+        user_id = await session.execute(insert(User).values(username='listener', password='x',
+                                                            email='listener@gmail.com').returning(User.id))
+        user_id = user_id.scalar()
+        channel_id = await session.execute(insert(Channel).values(name='live_channel', user_id=user_id)
+                                           .returning(Channel.id))
+        channel_id = channel_id.scalar()
+        await session.commit()
+    yield {'channel_id': channel_id, 'token': create_access_token('listener', user_id)}
+    async with async_session_test() as session:
+        await session.execute(delete(Post).where(Post.channel_id == channel_id))
+        await session.execute(delete(Channel).where(Channel.id == channel_id))
+        await session.execute(delete(User).where(User.id == user_id))
+        await session.commit()
+
+async def test_events_dispatch_to_topic_subscribers(mock_data: dict) -> None:
+    broker = Broker('unused', queue_size=2)
+    subscription = broker.subscribe([topic('channel', mock_data['channel_id'])])
+    other = broker.subscribe([topic('post', mock_data['channel_id'])])
+    broker.dispatch(event_payload('channel', mock_data['channel_id'], 'post.created', {'id': 1}))
+    assert subscription.queue.get_nowait() == b'event: post.created\ndata: {"id":1}\n\n'
+    assert other.queue.empty()
+    broker.unsubscribe(subscription)
+    broker.unsubscribe(other)
+    assert broker.topics == {}
+    assert broker.subscribers == 0
+
+async def test_events_slow_subscriber_overflow(mock_data: dict) -> None:
+    broker = Broker('unused', queue_size=2)
+    subscription = broker.subscribe([topic('channel', mock_data['channel_id'])])
+    for index in range(3):
+        broker.dispatch(event_payload('channel', mock_data['channel_id'], 'post.created', {'id': index}))
+    assert subscription.queue.get_nowait() == OVERFLOW_FRAME
+    assert subscription.queue.empty()
+    assert subscription.dropped == 2
+
+async def test_events_stream_heartbeat_and_cleanup(mock_data: dict) -> None:
+    broker = Broker('unused')
+    subscription = broker.subscribe([topic('channel', mock_data['channel_id'])])
+    stream = event_stream(broker, subscription, heartbeat=0.01)
+    assert await stream.__anext__() == b'retry: 3000\n\n'
+    assert await stream.__anext__() == b': keep-alive\n\n'
+    await stream.aclose()
+    assert broker.subscribers == 0
+
+async def test_events_require_topics(default_client: httpx.AsyncClient) -> None:
+    response = await default_client.get('/events')
+    assert response.status_code == 400
+
+async def test_events_create_post_notifies(default_client: httpx.AsyncClient, mock_data: dict) -> None:
+    broker = Broker(DATABASE_URL_TEST.replace('+asyncpg', ''))
+    broker.start()
+    try:
+        await asyncio.wait_for(broker.connected.wait(), 5)
+        subscription = broker.subscribe([topic('channel', mock_data['channel_id'])])
+        response = await default_client.post(f'/posts/{mock_data["channel_id"]}',
+                                             json={'name': 'live_post', 'description': 'live_desc'},
+                                             headers={'Authorization': f'Bearer {mock_data["token"]}'})
+        assert response.status_code == 200
+        frame = await asyncio.wait_for(subscription.queue.get(), 5)
+        assert frame.startswith(b'event: post.created\n')
+        assert str(mock_data['channel_id']).encode() in frame
+        async with async_session_test() as session:
+            await publish(session, [event_payload('channel', mock_data['channel_id'], 'post.created', {'id': 'x'})])
+            await session.rollback()
+        await asyncio.sleep(0.1)
+        assert subscription.queue.empty()
+    finally:
+        await broker.stop()
+
+async def test_events_overflow_after_reconnect(mock_data: dict) -> None:
+    broker = Broker(DATABASE_URL_TEST.replace('+asyncpg', ''))
+    broker.start()
+    try:
+        await asyncio.wait_for(broker.connected.wait(), 5)
+        subscription = broker.subscribe([topic('channel', mock_data['channel_id'])])
+        async with async_session_test() as session:
+            await session.execute(text("SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                                       "WHERE query LIKE 'LISTEN %' AND pid <> pg_backend_pid()"))
+        assert await asyncio.wait_for(subscription.queue.get(), 5) == OVERFLOW_FRAME
+        assert broker.connected.is_set()
+        broker.unsubscribe(subscription)
+    finally:
+        await broker.stop()
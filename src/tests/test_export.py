@@ -0,0 +1,60 @@
+import json
+import httpx
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import insert, delete
+from .conftest import async_session_test
+from database.export import stream_ndjson
+from models.users import User
+from models.channels import Channel
+from models.posts import Post
+from models.comments import Comment
+from schemas.posts import PostSummary
+
+@pytest.fixture(autouse=True, scope='module')
+async def mock_data() -> dict:
+    async with async_session_test() as session:
+        user_id = await session.execute(insert(User).values(username='exporter', password='x',
+                                                            email='exporter@gmail.com').returning(User.id))
+        user_id = user_id.scalar()
+        channel_id = await session.execute(insert(Channel).values(name='export_channel', user_id=user_id)
+                                           .returning(Channel.id))
+        channel_id = channel_id.scalar()
+        post_ids = await session.execute(insert(Post).values([
+            {'name': f'export_post_{index}', 'description': 'export_desc', 'channel_id': channel_id}
+            for index in range(5)]).returning(Post.id))
+        post_ids = post_ids.scalars().all()
+        await session.execute(insert(Comment).values([
+            {'description': 'export_comment', 'user_id': user_id, 'post_id': post_ids[0]} for _ in range(3)]))
+        await session.commit()
+    yield {'channel_id': channel_id, 'post_id': post_ids[0]}
+    async with async_session_test() as session:
+        await session.execute(delete(Comment).where(Comment.user_id == user_id))
+        await session.execute(delete(Post).where(Post.channel_id == channel_id))
+        await session.execute(delete(Channel).where(Channel.id == channel_id))
+        await session.execute(delete(User).where(User.id == user_id))
+        await session.commit()
+
+async def test_export_posts(default_client: httpx.AsyncClient, mock_data: dict) -> None:
+    response = await default_client.get('/export/posts', params={'channel_id': str(mock_data['channel_id'])})
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 5
+    assert {row['name'] for row in rows} == {f'export_post_{index}' for index in range(5)}
+    assert 'comments' not in rows[0]
+
+async def test_export_comments_since(default_client: httpx.AsyncClient, mock_data: dict) -> None:
+    response = await default_client.get('/export/comments', params={'post_id': str(mock_data['post_id'])})
+    assert len(response.text.splitlines()) == 3
+    since = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    response = await default_client.get('/export/comments', params={'post_id': str(mock_data['post_id']),
+                                                                    'since': since})
+    assert response.status_code == 200
+    assert response.text == ''
+
+async def test_export_chunks(mock_data: dict) -> None:
+    async with async_session_test() as session:
+        chunks = [chunk async for chunk in stream_ndjson(session, Post, PostSummary,
+                                                         Post.channel_id == mock_data['channel_id'], chunk_size=2)]
+    assert [chunk.count(b'\n') for chunk in chunks] == [2, 2, 1]
@@ -0,0 +1,12 @@
+import httpx
+
+async def test_database_health(default_client: httpx.AsyncClient) -> None:
+    response = await default_client.get('/health/db')
+    assert response.status_code == 200
+    assert response.json()['status'] == 'ok'
+    assert 0 <= response.json()['saturation'] <= 1
+
+async def test_cache_health(default_client: httpx.AsyncClient) -> None:
+    response = await default_client.get('/health/cache')
+    assert response.status_code == 200
+    assert response.json()['backend'] == 'memory'
@@ -0,0 +1,44 @@
+import httpx
+import pytest
+from metrics import http_requests, sql_statements
+from metrics.registry import Metric, Registry
+
+async def test_metrics_exposition(default_client: httpx.AsyncClient) -> None:
+    await default_client.get('/channels/')
+    response = await default_client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    assert '# TYPE http_request_duration_seconds histogram' in response.text
+    assert 'http_requests_total{method="GET",route="/channels/",status="200"}' in response.text
+    assert 'db_pool_checkout_wait_seconds' in response.text
+
+async def test_metrics_route_template(default_client: httpx.AsyncClient) -> None:
+    await default_client.get('/posts/00000000-0000-0000-0000-000000000000')
+    assert http_requests._values[('GET', '/posts/{id}', '404')] >= 1
+
+async def test_metrics_sql_per_request(default_client: httpx.AsyncClient) -> None:
+    await default_client.get('/health/db')
+    counts, total, count = sql_statements._values[('GET', '/health/db')]
+    assert count >= 1
+    assert total >= count
+
+def test_histogram_render() -> None:
+    registry = Registry()
+    histogram = registry.histogram('latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1))
+    histogram.observe(0.05, '/a')
+    histogram.observe(0.5, '/a')
+    histogram.observe(5, '/a')
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+
+def test_gauge_set_and_abstract_metric() -> None:
+    registry = Registry()
+    gauge = registry.gauge('queue_depth', 'Queue depth.', ('queue',))
+    gauge.set(3, 'a')
+    gauge.inc('a')
+    assert 'queue_depth{queue="a"} 4' in registry.render().splitlines()
+    with pytest.raises(TypeError):
+        Metric('bare', 'No render.')
@@ -1,12 +1,17 @@
+import asyncio
+import uuid
 import httpx
 import pytest
-from sqlalchemy import select, insert
+from sqlalchemy import select, insert, update, func
 from .conftest import async_session_test
+from database.counters import reconcile_counters
+from cache.responses import response_cache
 from auth.jwt_handler import create_access_token
 from auth.hash_password import HashPassword
 from models.users import User, user_post
 from models.channels import Channel
 from models.posts import Post
+from models.comments import Comment
 from schemas.users import UserIn
 from schemas.channels import ChannelIn
 from schemas.posts import PostIn
@@ -15,11 +20,15 @@ hash_password = HashPassword()
 
 @pytest.fixture(scope='module')
 async def access_token() -> str:
-    return create_access_token('ivan')
+    async with async_session_test() as session:
+        user_id = await session.execute(select(User.id).where(User.username == 'ivan'))
+        return create_access_token('ivan', user_id.scalar())
 
 @pytest.fixture(scope='module')
 async def access_token_other_user() -> str:
-    return create_access_token('solidguy7')
+    async with async_session_test() as session:
+        user_id = await session.execute(select(User.id).where(User.username == 'solidguy7'))
+        return create_access_token('solidguy7', user_id.scalar())
 
 @pytest.fixture(autouse=True, scope='module')
 async def mock_data() -> None:
@@ -48,7 +57,7 @@ async def mock_data() -> None:
 async def test_post_get_all(default_client: httpx.AsyncClient) -> None:
     response = await default_client.get('/posts/')
     assert response.status_code == 200
-    assert response.json()[0]['name'] == 'test_post'
+    assert response.json()['items'][0]['name'] == 'test_post'
 
 async def test_post_get_by_id(default_client: httpx.AsyncClient) -> None:
     async with async_session_test() as session:
@@ -57,6 +66,45 @@ async def test_post_get_by_id(default_client: httpx.AsyncClient) -> None:
         assert response.status_code == 200
         assert response.json()['name'] == 'test_post'
 
+async def test_post_get_all_expand(default_client: httpx.AsyncClient) -> None:
+    response = await default_client.get('/posts/')
+    assert response.status_code == 200
+    assert 'comments' not in response.json()['items'][0]
+    response = await default_client.get('/posts/', params={'expand': 'comments'})
+    assert response.status_code == 200
+    assert isinstance(response.json()['items'][0]['comments'], list)
+
+async def test_post_get_all_fast_path_matches_schema(default_client: httpx.AsyncClient) -> None:
+    fast = await default_client.get('/posts/')
+    validated = await default_client.get('/posts/', params={'expand': 'comments'})
+    assert fast.json()['next_cursor'] == validated.json()['next_cursor']
+    for fast_item, validated_item in zip(fast.json()['items'], validated.json()['items']):
+        validated_item.pop('comments')
+        assert fast_item == validated_item
+        assert list(fast_item) == list(validated_item)
+
+async def test_post_get_all_paginated(default_client: httpx.AsyncClient) -> None:
+    async with async_session_test() as session:
+        channel_id = await session.execute(select(Channel.id).where(Channel.name == 'new_channel'))
+        post = PostIn(name='paginated_post', description='paginated_desc')
+        await session.execute(insert(Post).values(channel_id=channel_id.scalar(), **post.dict()))
+        await session.commit()
+    response = await default_client.get('/posts/', params={'limit': 1})
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page['items']) == 1
+    assert page['next_cursor'] is not None
+    response = await default_client.get('/posts/', params={'limit': 1, 'after': page['next_cursor']})
+    assert response.status_code == 200
+    assert response.json()['items'][0]['id'] != page['items'][0]['id']
+
+async def test_post_get_comments(default_client: httpx.AsyncClient) -> None:
+    async with async_session_test() as session:
+        id = await session.execute(select(Post.id).where(Post.name == 'test_post'))
+        response = await default_client.get(f'/posts/{id.scalar()}/comments')
+        assert response.status_code == 200
+        assert response.json()['items'] == []
+
 async def test_post_create(default_client: httpx.AsyncClient, access_token: str) -> None:
     async with async_session_test() as session:
         id = await session.execute(select(Channel.id).where(Channel.name == 'new_channel'))
@@ -95,9 +143,100 @@ async def test_post_create_stranger(default_client: httpx.AsyncClient, access_to
         assert response.status_code == 404
         assert response.json() == test_response
 
+async def test_post_create_bulk(default_client: httpx.AsyncClient, access_token: str) -> None:
+    async with async_session_test() as session:
+        own_id = await session.execute(select(Channel.id).where(Channel.name == 'new_channel'))
+        own_id = own_id.scalar()
+        payload = [
+            {'channel_id': str(own_id), 'name': 'bulk_post_1', 'description': 'bulk_desc'},
+            {'channel_id': '00000000-0000-0000-0000-000000000000', 'name': 'bulk_post_2', 'description': 'bulk_desc'},
+            {'channel_id': str(own_id), 'name': 'bulk_post_3', 'description': 'bulk_desc'}
+        ]
+        headers = {
+            'accept': 'application/json',
+            'content-type': 'application/json',
+            'authorization': f'Bearer {access_token}'
+        }
+        response = await default_client.post('/posts/bulk', json=payload, headers=headers)
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [result['status'] for result in results] == ['created', 'error', 'created']
+        assert results[1]['detail'] == 'You don`t have such a channel'
+        names = await session.execute(select(Post.name).where(Post.id.in_([results[0]['id'], results[2]['id']])))
+        assert set(names.scalars().all()) == {'bulk_post_1', 'bulk_post_3'}
+
+async def test_post_like_bulk(default_client: httpx.AsyncClient, access_token_other_user: str) -> None:
+    async with async_session_test() as session:
+        ids = await session.execute(select(Post.id).where(Post.name.in_(['bulk_post_1', 'bulk_post_3'])))
+        ids = [str(id) for id in ids.scalars().all()]
+        headers = {
+            'accept': 'application/json',
+            'content-type': 'application/json',
+            'authorization': f'Bearer {access_token_other_user}'
+        }
+        payload = ids + [ids[0], '00000000-0000-0000-0000-000000000000']
+        response = await default_client.post('/posts/bulk/like', json=payload, headers=headers)
+        assert response.status_code == 200
+        statuses = [result['status'] for result in response.json()['results']]
+        assert statuses == ['liked', 'liked', 'error', 'error']
+        response = await default_client.get(f'/posts/{ids[0]}')
+        assert response.json()['likes_count'] == 1
+        response = await default_client.post('/posts/bulk/like', json=ids[:1], headers=headers)
+        assert response.json()['results'][0]['status'] == 'unliked'
+
+async def test_post_like_bulk_concurrent(default_client: httpx.AsyncClient, access_token: str) -> None:
+    async with async_session_test() as session:
+        ids = await session.execute(select(Post.id).where(Post.name.in_(['bulk_post_1', 'bulk_post_3'])))
+        ids = [str(id) for id in ids.scalars().all()]
+    headers = {
+        'accept': 'application/json',
+        'content-type': 'application/json',
+        'authorization': f'Bearer {access_token}'
+    }
+    responses = await asyncio.gather(*(default_client.post('/posts/bulk/like', json=ids, headers=headers)
+                                       for _ in range(2)))
+    assert [response.status_code for response in responses] == [200, 200]
+    async with async_session_test() as session:
+        for index, id in enumerate(ids):
+            statuses = sorted(response.json()['results'][index]['status'] for response in responses)
+            assert statuses in (['error', 'liked'], ['liked', 'unliked'])
+            likes = await session.execute(select(func.count()).where(user_post.c.post_id == id))
+            count = await session.execute(select(Post.likes_count).where(Post.id == id))
+            assert count.scalar() == likes.scalar()
+
+async def test_post_feed(default_client: httpx.AsyncClient, access_token: str,
+                         access_token_other_user: str) -> None:
+    async with async_session_test() as session:
+        id = await session.execute(select(Channel.id).where(Channel.name == 'new_channel'))
+        id = id.scalar()
+        headers = {
+            'accept': 'application/json',
+            'authorization': f'Bearer {access_token_other_user}'
+        }
+        response = await default_client.post(f'/channels/follow/{id}', headers=headers)
+        assert response.status_code == 200
+        response = await default_client.get('/users/me/feed', headers=headers)
+        assert response.status_code == 200
+        backfilled = response.json()['items']
+        assert {post['channel_id'] for post in backfilled} == {str(id)}
+        payload = {
+            'name': 'feed_post',
+            'description': 'feed_desc'
+        }
+        response = await default_client.post(f'/posts/{id}', json=payload, headers={
+            'accept': 'application/json',
+            'content-type': 'application/json',
+            'authorization': f'Bearer {access_token}'
+        })
+        assert response.status_code == 200
+        response = await default_client.get('/users/me/feed', headers=headers)
+        assert response.status_code == 200
+        assert response.json()['items'][0]['name'] == 'feed_post'
+        assert len(response.json()['items']) == len(backfilled) + 1
+
 async def test_post_like(default_client: httpx.AsyncClient, access_token: str) -> None:
     async with async_session_test() as session:
-        id = await session.execute(select(Post.id))
+        id = await session.execute(select(Post.id).where(Post.name == 'test_post'))
         headers = {
             'accept': 'application/json',
             'authorization': f'Bearer {access_token}'
@@ -111,9 +250,9 @@ async def test_post_like(default_client: httpx.AsyncClient, access_token: str) -
 
 async def test_post_unlike(default_client: httpx.AsyncClient, access_token: str) -> None:
     async with async_session_test() as session:
-        id = await session.execute(select(Post.id))
+        id = await session.execute(select(Post.id).where(Post.name == 'test_post'))
         id = id.scalar()
-        user_id = await session.execute(select(User.id))
+        user_id = await session.execute(select(User.id).where(User.username == 'solidguy7'))
         user_id = user_id.scalar()
         await session.execute(insert(user_post).values(user_id=user_id, post_id=id))
         await session.commit()
@@ -128,6 +267,52 @@ async def test_post_unlike(default_client: httpx.AsyncClient, access_token: str)
         assert response.status_code == 200
         assert response.json() == test_response
 
+async def test_post_like_missing(default_client: httpx.AsyncClient, access_token: str, monkeypatch) -> None:
+    monkeypatch.setattr('routes.posts.WRITE_BEHIND', False)
+    headers = {
+        'accept': 'application/json',
+        'authorization': f'Bearer {access_token}'
+    }
+    response = await default_client.post(f'/posts/like/{uuid.uuid4()}', headers=headers)
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'Post not found'}
+
+async def test_post_reconcile_counters() -> None:
+    async with async_session_test() as session:
+        id = await session.execute(select(Post.id).where(Post.name == 'test_post'))
+        id = id.scalar()
+        likes = await session.execute(select(func.count()).where(user_post.c.post_id == id))
+        likes = likes.scalar()
+        comments = await session.execute(select(func.count()).where(Comment.post_id == id))
+        comments = comments.scalar()
+        await session.execute(update(Post).where(Post.id == id)
+                              .values(likes_count=likes + 7, comments_count=comments + 5))
+        await session.commit()
+        repaired = await reconcile_counters(session)
+        assert repaired['posts.likes_count'] >= 1
+        assert repaired['posts.comments_count'] >= 1
+        counts = await session.execute(select(Post.likes_count, Post.comments_count).where(Post.id == id))
+        assert tuple(counts.one()) == (likes, comments)
+
+async def test_post_cached_until_liked(default_client: httpx.AsyncClient, access_token_other_user: str) -> None:
+    async with async_session_test() as session:
+        id = await session.execute(select(Post.id).where(Post.name == 'test_post'))
+        id = id.scalar()
+        response = await default_client.get(f'/posts/{id}')
+        assert response.status_code == 200
+        likes = response.json()['likes_count']
+        hits = response_cache.hits
+        assert (await default_client.get(f'/posts/{id}')).json() == response.json()
+        assert response_cache.hits == hits + 1
+        headers = {
+            'accept': 'application/json',
+            'authorization': f'Bearer {access_token_other_user}'
+        }
+        response = await default_client.post(f'/posts/like/{id}', headers=headers)
+        assert response.status_code == 200
+        response = await default_client.get(f'/posts/{id}')
+        assert response.json()['likes_count'] == likes - 1
+
 async def test_post_update(default_client: httpx.AsyncClient, access_token: str) -> None:
     async with async_session_test() as session:
         id = await session.execute(select(Post.id))
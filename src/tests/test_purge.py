@@ -0,0 +1,122 @@
+import asyncio
+import httpx
+import pytest
+from sqlalchemy import select, insert, delete, func
+from .conftest import async_session_test
+from auth.jwt_handler import create_access_token
+from database.purge import ChannelPurger
+from database.toggles import ToggleBuffer
+from models.users import User, user_post, user_channel
+from models.channels import Channel
+from models.posts import Post
+from models.comments import Comment
+from models.feed import FeedEntry
+
+@pytest.fixture(autouse=True, scope='module')
+async def mock_data() -> dict:
+    async with async_session_test() as session:
+        user_ids = await session.execute(insert(User).values([
+            {'username': f'purger{index}', 'password': 'x', 'email': f'purger{index}@gmail.com'}
+            for index in range(2)]).returning(User.id))
+        owner, follower = user_ids.scalars().all()
+        channel_id = await session.execute(insert(Channel).values(name='purge_channel', user_id=owner)
+                                           .returning(Channel.id))
+        channel_id = channel_id.scalar()
+        post_ids = await session.execute(insert(Post).values([
+            {'name': f'purge{index}', 'description': 'purge_desc', 'channel_id': channel_id} for index in range(5)
+        ]).returning(Post.id, Post.created))
+        posts = post_ids.all()
+        await session.execute(insert(Comment).values([
+            {'description': f'comment{index}', 'user_id': follower, 'post_id': post_id}
+            for post_id, _ in posts for index in range(3)]))
+        await session.execute(insert(user_post).values([{'user_id': follower, 'post_id': post_id}
+                                                        for post_id, _ in posts]))
+        await session.execute(insert(user_channel).values(user_id=follower, channel_id=channel_id))
+        await session.execute(insert(FeedEntry).values([
+            {'user_id': follower, 'post_id': post_id, 'channel_id': channel_id, 'created': created}
+            for post_id, created in posts]))
+        await session.commit()
+    yield {'owner': owner, 'follower': follower, 'channel': channel_id, 'posts': [post_id for post_id, _ in posts]}
+    async with async_session_test() as session:
+        await session.execute(delete(Channel).where(Channel.id == channel_id))
+        await session.execute(delete(User).where(User.id.in_([owner, follower])))
+        await session.commit()
+
+async def count(model, *criteria) -> int:
+    async with async_session_test() as session:
+        return (await session.execute(select(func.count()).select_from(model).where(*criteria))).scalar()
+
+async def test_deleted_channel_is_hidden_then_purged(default_client: httpx.AsyncClient, mock_data: dict) -> None:
+    channel_id, post_id = mock_data['channel'], mock_data['posts'][0]
+    token = create_access_token('purger0', mock_data['owner'])
+    response = await default_client.delete(f'/channels/{channel_id}', headers={'authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert (await default_client.get(f'/channels/{channel_id}')).status_code == 404
+    assert (await default_client.get(f'/posts/{post_id}')).status_code == 404
+    assert (await default_client.get(f'/channels/{channel_id}/posts')).json()['items'] == []
+    assert (await default_client.get(f'/posts/{post_id}/comments')).json()['items'] == []
+    assert await count(Comment, Comment.post_id.in_(mock_data['posts'])) == 15
+    again = await default_client.delete(f'/channels/{channel_id}', headers={'authorization': f'Bearer {token}'})
+    assert again.status_code == 404
+    follower = {'authorization': f'Bearer {create_access_token("purger1", mock_data["follower"])}'}
+    assert (await default_client.post(f'/posts/like/{post_id}', headers=follower)).status_code == 404
+    assert (await default_client.post(f'/channels/follow/{channel_id}', headers=follower)).status_code == 404
+    response = await default_client.post(f'/comments/{post_id}', json={'description': 'late'}, headers=follower)
+    assert response.status_code == 404
+    response = await default_client.post('/comments/bulk', json=[{'post_id': str(post_id), 'description': 'late'}],
+                                         headers=follower)
+    assert response.json()['results'][0]['detail'] == 'Post not found'
+    response = await default_client.post('/posts/bulk/like', json=[str(post_id)], headers=follower)
+    assert response.json()['results'][0]['detail'] == 'Post not found'
+    response = await default_client.post('/channels/bulk/follow', json=[str(channel_id)], headers=follower)
+    assert response.json()['results'][0]['detail'] == 'Channel not found'
+    buffer = ToggleBuffer(user_post, 'post_id', Post, Post.likes_count, 'post', session_factory=async_session_test)
+    async with async_session_test() as session:
+        assert await buffer.toggle(session, mock_data['follower'], post_id) is None
+    assert await count(user_post, user_post.c.post_id.in_(mock_data['posts'])) == 5
+    assert await count(user_channel, user_channel.c.channel_id == channel_id) == 1
+    purger = ChannelPurger(chunk_size=4, pause=0, session_factory=async_session_test)
+    assert await purger.purge() >= 1
+    assert await count(Channel, Channel.id == channel_id) == 0
+    assert await count(Post, Post.channel_id == channel_id) == 0
+    assert await count(Comment, Comment.post_id.in_(mock_data['posts'])) == 0
+    assert await count(user_post, user_post.c.post_id.in_(mock_data['posts'])) == 0
+    assert await count(user_channel, user_channel.c.channel_id == channel_id) == 0
+    assert await count(FeedEntry, FeedEntry.channel_id == channel_id) == 0
+    assert await purger.purge() == 0
+
+async def test_post_delete_cascades(mock_data: dict) -> None:
+    async with async_session_test() as session:
+        channel_id = await session.execute(insert(Channel).values(name='cascade_channel', user_id=mock_data['owner'])
+                                           .returning(Channel.id))
+        channel_id = channel_id.scalar()
+        post_id = await session.execute(insert(Post).values(name='cascade', description='cascade_desc',
+                                                            channel_id=channel_id).returning(Post.id))
+        post_id = post_id.scalar()
+        await session.execute(insert(Comment).values(description='doomed', user_id=mock_data['follower'],
+                                                     post_id=post_id))
+        await session.execute(insert(user_post).values(user_id=mock_data['follower'], post_id=post_id))
+        await session.execute(delete(Post).where(Post.id == post_id))
+        await session.execute(delete(Channel).where(Channel.id == channel_id))
+        await session.commit()
+    assert await count(Comment, Comment.post_id == post_id) == 0
+    assert await count(user_post, user_post.c.post_id == post_id) == 0
+
+async def test_purge_failures_are_logged(caplog) -> None:
+    calls = []
+
+    def broken_session():
+        calls.append(None)
+        raise RuntimeError('database unavailable')
+
+    purger = ChannelPurger(session_factory=broken_session)
+    task = asyncio.get_running_loop().create_task(purger.run(0.01))
+    for _ in range(500):
+        if len(calls) >= 2:
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert len(calls) >= 2
+    assert 'Channel purge failed' in caplog.text
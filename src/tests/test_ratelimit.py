@@ -0,0 +1,52 @@
+import httpx
+from fastapi import FastAPI
+from ratelimit.backends import MemoryBackend
+from ratelimit.limiter import RateLimitMiddleware, Policy
+from auth.jwt_handler import create_access_token
+
+async def test_memory_backend_refills_and_reports_retry_after() -> None:
+    backend = MemoryBackend(max_keys=10)
+    assert [(await backend.take('signin:ip', 2, 1))[0] for _ in range(3)] == [True, True, False]
+    allowed, retry_after = await backend.take('signin:ip', 2, 1)
+    assert not allowed and 0 < retry_after <= 1
+    assert (await backend.take('signin:other', 2, 1))[0]
+
+async def test_memory_backend_evicts_idle_keys() -> None:
+    backend = MemoryBackend(max_keys=2)
+    for key in ('a', 'b', 'c'):
+        await backend.take(key, 1, 0.001)
+    assert backend.stats()['keys'] == 2
+    assert not (await backend.take('c', 1, 0.001))[0]
+
+def limited_app(backend: MemoryBackend) -> FastAPI:
+    app = FastAPI()
+
+    @app.post('/users/signin')
+    async def signin() -> dict:
+        return {}
+
+    @app.get('/items/{id}')
+    async def item(id: int) -> dict:
+        return {'id': id}
+
+    app.add_middleware(RateLimitMiddleware, backend=backend, enabled=True, policies={
+        ('POST', '/users/signin'): Policy('signin', 2, 60, per_principal=False)
+    })
+    return app
+
+async def test_middleware_applies_route_policy() -> None:
+    async with httpx.AsyncClient(app=limited_app(MemoryBackend(100)), base_url='http://app') as client:
+        statuses = [(await client.post('/users/signin')).status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        response = await client.post('/users/signin')
+        assert response.json() == {'detail': 'Too many requests'}
+        assert 1 <= int(response.headers['retry-after']) <= 30
+        assert (await client.get('/items/1')).status_code == 200
+
+async def test_middleware_keys_reads_by_principal() -> None:
+    backend = MemoryBackend(100)
+    async with httpx.AsyncClient(app=limited_app(backend), base_url='http://app') as client:
+        token = create_access_token('limited', '00000000-0000-0000-0000-000000000001')
+        await client.get('/items/1', headers={'Authorization': f'Bearer {token}'})
+        await client.get('/items/1')
+    assert set(backend._buckets) == {'read:user:00000000-0000-0000-0000-000000000001', 'read:ip:127.0.0.1'}
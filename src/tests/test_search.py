@@ -0,0 +1,90 @@
+import httpx
+import pytest
+from sqlalchemy import insert, delete, func
+from .conftest import async_session_test
+from models.users import User
+from models.channels import Channel
+from models.posts import Post
+from models.comments import Comment
+
+@pytest.fixture(autouse=True, scope='module')
+async def mock_data() -> dict:
+    async with async_session_test() as session:
+        user_id = await session.execute(insert(User).values(username='searcher', password='x',
+                                                            email='searcher@gmail.com').returning(User.id))
+        user_id = user_id.scalar()
+        channel_id = await session.execute(insert(Channel).values(name='search_channel', user_id=user_id)
+                                           .returning(Channel.id))
+        channel_id = channel_id.scalar()
+        post_ids = await session.execute(insert(Post).values([
+            {'name': 'Walrus migration', 'description': 'walrus walrus walrus herds', 'channel_id': channel_id},
+            {'name': 'Arctic notes', 'description': 'a walrus was seen', 'channel_id': channel_id},
+            {'name': 'Walruses', 'description': 'the walrus colony grows', 'channel_id': channel_id},
+            {'name': 'Penguins', 'description': 'nothing to see here', 'channel_id': channel_id}
+        ]).returning(Post.id))
+        post_ids = post_ids.scalars().all()
+        await session.execute(insert(Comment).values(description='Lovely walrus pictures', user_id=user_id,
+                                                     post_id=post_ids[3]))
+        await session.commit()
+    yield {'user_id': user_id, 'channel_id': channel_id, 'post_ids': post_ids}
+    async with async_session_test() as session:
+        await session.execute(delete(Comment).where(Comment.user_id == user_id))
+        await session.execute(delete(Post).where(Post.channel_id == channel_id))
+        await session.execute(delete(Channel).where(Channel.id == channel_id))
+        await session.execute(delete(User).where(User.id == user_id))
+        await session.commit()
+
+async def test_search_posts_ranked(default_client: httpx.AsyncClient, mock_data: dict) -> None:
+    response = await default_client.get('/search/posts', params={'q': 'walruses'})
+    assert response.status_code == 200
+    items = response.json()['items']
+    assert len(items) == 3
+    assert items[0]['id'] == str(mock_data['post_ids'][0])
+    assert [item['rank'] for item in items] == sorted((item['rank'] for item in items), reverse=True)
+
+async def test_search_posts_paginated(default_client: httpx.AsyncClient) -> None:
+    first = await default_client.get('/search/posts', params={'q': 'walrus', 'limit': 2})
+    assert first.json()['next_cursor'] is not None
+    second = await default_client.get('/search/posts', params={'q': 'walrus', 'limit': 2,
+                                                               'after': first.json()['next_cursor']})
+    ids = [item['id'] for item in first.json()['items'] + second.json()['items']]
+    assert len(ids) == len(set(ids)) == 3
+    assert second.json()['next_cursor'] is None
+
+async def test_search_posts_updated(default_client: httpx.AsyncClient, mock_data: dict) -> None:
+    async with async_session_test() as session:
+        await session.execute(Post.__table__.update().where(Post.id == mock_data['post_ids'][3])
+                              .values(description='penguins and a walrus'))
+        await session.commit()
+    response = await default_client.get('/search/posts', params={'q': 'walrus', 'author_id': str(mock_data['user_id'])})
+    assert len(response.json()['items']) == 4
+
+async def test_search_comments_filters(default_client: httpx.AsyncClient, mock_data: dict) -> None:
+    response = await default_client.get('/search/comments', params={'q': 'walrus',
+                                                                   'channel_id': str(mock_data['channel_id'])})
+    assert [item['description'] for item in response.json()['items']] == ['Lovely walrus pictures']
+    response = await default_client.get('/search/comments', params={
+        'q': 'walrus', 'author_id': '00000000-0000-0000-0000-000000000000'})
+    assert response.json()['items'] == []
+
+async def test_search_comments_skips_hidden_channels(default_client: httpx.AsyncClient, mock_data: dict) -> None:
+    async with async_session_test() as session:
+        channel_id = await session.execute(insert(Channel).values(name='hidden_channel', user_id=mock_data['user_id'],
+                                                                  deleted_at=func.now()).returning(Channel.id))
+        channel_id = channel_id.scalar()
+        post_id = await session.execute(insert(Post).values(name='Hidden', description='hidden walrus',
+                                                            channel_id=channel_id).returning(Post.id))
+        await session.execute(insert(Comment).values(description='Hidden walrus comment', user_id=mock_data['user_id'],
+                                                     post_id=post_id.scalar()))
+        await session.commit()
+    try:
+        response = await default_client.get('/search/comments', params={'q': 'walrus'})
+        assert [item['description'] for item in response.json()['items']] == ['Lovely walrus pictures']
+    finally:
+        async with async_session_test() as session:
+            await session.execute(delete(Channel).where(Channel.id == channel_id))
+            await session.commit()
+
+async def test_search_invalid_cursor(default_client: httpx.AsyncClient) -> None:
+    response = await default_client.get('/search/posts', params={'q': 'walrus', 'after': 'garbage'})
+    assert response.status_code == 400
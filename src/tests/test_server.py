@@ -0,0 +1,28 @@
+import asyncio
+from server import Server, build_config
+
+class Connection:
+    def __init__(self) -> None:
+        self.transport = self
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+async def test_drain_deadline_closes_lingering_connections() -> None:
+    server = Server(build_config(workers=1, reload=False), graceful_timeout=0)
+    connection = Connection()
+    stream = asyncio.get_running_loop().create_task(asyncio.sleep(60))
+    server.server_state.connections.add(connection)
+    server.server_state.tasks.add(stream)
+    await server.drain_deadline()
+    await asyncio.sleep(0)
+    assert connection.closed
+    assert stream.cancelled()
+
+def test_build_config_applies_overrides() -> None:
+    config = build_config(workers=4, reload=False, timeout_keep_alive=15, backlog=4096)
+    assert config.workers == 4
+    assert config.timeout_keep_alive == 15
+    assert config.backlog == 4096
+    assert config.app == 'main:app'
@@ -0,0 +1,93 @@
+import uuid
+import httpx
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, delete
+from .conftest import async_session_test
+from database.trending import TrendingIndex, trending_index
+from models.users import User, user_post
+from models.channels import Channel
+from models.posts import Post
+from models.comments import Comment
+
+@pytest.fixture(autouse=True, scope='module')
+async def mock_data() -> dict:
+    now = datetime.utcnow()
+    async with async_session_test() as session:
+        user_ids = await session.execute(insert(User).values([
+            {'username': f'trender{index}', 'password': 'x', 'email': f'trender{index}@gmail.com'}
+            for index in range(3)]).returning(User.id))
+        user_ids = user_ids.scalars().all()
+        channel_id = await session.execute(insert(Channel).values(name='trending_channel', user_id=user_ids[0])
+                                           .returning(Channel.id))
+        channel_id = channel_id.scalar()
+        post_ids = await session.execute(insert(Post).values([
+            {'name': name, 'description': 'trending_desc', 'channel_id': channel_id}
+            for name in ('hot', 'warm', 'stale')]).returning(Post.id))
+        hot, warm, stale = post_ids.scalars().all()
+        await session.execute(insert(user_post).values(
+            [{'user_id': user_id, 'post_id': hot, 'created': now - timedelta(minutes=5)} for user_id in user_ids] +
+            [{'user_id': user_ids[0], 'post_id': warm, 'created': now - timedelta(hours=6)}] +
+            [{'user_id': user_id, 'post_id': stale, 'created': now - timedelta(days=3)} for user_id in user_ids]))
+        await session.execute(insert(Comment).values(description='nice', user_id=user_ids[1], post_id=warm,
+                                                     created=now - timedelta(hours=6)))
+        await session.commit()
+    yield {'hot': hot, 'warm': warm, 'stale': stale}
+    async with async_session_test() as session:
+        await session.execute(delete(Comment).where(Comment.post_id.in_([hot, warm, stale])))
+        await session.execute(delete(user_post).where(user_post.c.post_id.in_([hot, warm, stale])))
+        await session.execute(delete(Post).where(Post.channel_id == channel_id))
+        await session.execute(delete(Channel).where(Channel.id == channel_id))
+        await session.execute(delete(User).where(User.id.in_(user_ids)))
+        await session.commit()
+
+async def test_trending_ranks_recent_activity(default_client: httpx.AsyncClient, mock_data: dict) -> None:
+    async with async_session_test() as session:
+        await trending_index.refresh(session)
+    response = await default_client.get('/posts/trending', params={'limit': 100})
+    assert response.status_code == 200
+    ids = [item['id'] for item in response.json()['items']]
+    assert ids.index(str(mock_data['hot'])) < ids.index(str(mock_data['warm']))
+    assert str(mock_data['stale']) not in ids
+    warm = next(item for item in response.json()['items'] if item['id'] == str(mock_data['warm']))
+    assert warm['name'] == 'warm'
+    assert 1.4 < warm['score'] < 1.6
+
+async def test_trending_refresh_is_incremental(mock_data: dict) -> None:
+    index = TrendingIndex(half_life=3600, window=86400, size=10, like_weight=1, comment_weight=2)
+    async with async_session_test() as session:
+        await index.refresh(session)
+        before = index.scores[mock_data['warm']]
+        await session.commit()
+        await session.execute(insert(Comment).values(description='again', post_id=mock_data['warm']))
+        await session.commit()
+        await index.refresh(session)
+    assert index.scores[mock_data['warm']] > before
+
+async def test_trending_counts_first_like_only(mock_data: dict) -> None:
+    index = TrendingIndex(half_life=3600, window=86400, size=10, like_weight=1, comment_weight=2)
+    async with async_session_test() as session:
+        await index.refresh(session)
+        before = index.scores[mock_data['hot']]
+        user_id = (await session.execute(select(user_post.c.user_id).where(user_post.c.post_id == mock_data['hot'])))\
+            .scalars().first()
+        await session.commit()
+        for _ in range(3):
+            await session.execute(delete(user_post).where(user_post.c.user_id == user_id)
+                                  .where(user_post.c.post_id == mock_data['hot']))
+            await session.execute(insert(user_post).values(user_id=user_id, post_id=mock_data['hot']))
+            await session.commit()
+        await index.refresh(session)
+    assert index.scores[mock_data['hot']] == pytest.approx(before)
+
+def test_trending_window_expiry() -> None:
+    index = TrendingIndex(half_life=3600, window=7200, size=10, like_weight=1, comment_weight=2, buckets=2)
+    start = datetime(2026, 1, 1)
+    index.epoch = start
+    post_id = uuid.uuid4()
+    index.add({post_id: 1.0}, start + timedelta(hours=1))
+    index.add({post_id: 2.0}, start + timedelta(hours=2))
+    index.expire(start + timedelta(hours=3, minutes=30))
+    assert index.scores == {post_id: 2.0}
+    index.expire(start + timedelta(hours=5))
+    assert index.scores == {}
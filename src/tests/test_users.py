@@ -1,8 +1,14 @@
+import time
+import uuid
 import httpx
 import pytest
+from fastapi import HTTPException
+from jose import jwt
 from sqlalchemy import insert
 from .conftest import async_session_test
 from auth.hash_password import HashPassword
+from auth.jwt_handler import create_access_token, verify_access_token, invalidate_access_token, token_cache
+from database.connection import SECRET_KEY
 from models.users import User
 from schemas.users import UserIn
 
@@ -78,4 +84,48 @@ async def test_sign_in(default_client: httpx.AsyncClient) -> None:
     }
     response = await default_client.post('/users/signin', data=payload, headers=headers)
     assert response.status_code == 200
-    assert response.json()['token_type'] == 'Bearer'
\ No newline at end of file
+    assert response.json()['token_type'] == 'Bearer'
+
+async def test_async_hash_round_trip() -> None:
+    hashed_password = await hash_password.acreate_hash('123')
+    assert await hash_password.averify_hash('123', hashed_password)
+    assert not await hash_password.averify_hash('1234', hashed_password)
+
+async def test_async_hash_queue_full() -> None:
+    with pytest.raises(HTTPException) as error:
+        await HashPassword(max_pending=0).acreate_hash('123')
+    assert error.value.status_code == 503
+    assert error.value.headers == {'Retry-After': '1'}
+
+async def test_verify_access_token_cached() -> None:
+    token = create_access_token('test', uuid.uuid4())
+    misses = token_cache.misses
+    data = verify_access_token(token)
+    hits = token_cache.hits
+    assert verify_access_token(token) == data
+    assert token_cache.hits == hits + 1
+    invalidate_access_token(token)
+    assert verify_access_token(token) == data
+    assert token_cache.misses == misses + 2
+
+async def test_feed_with_token_without_user_id(default_client: httpx.AsyncClient) -> None:
+    token = jwt.encode({'user': 'test', 'expires': time.time() + 3600}, SECRET_KEY, algorithm='HS256')
+    headers = {
+        'accept': 'application/json',
+        'authorization': f'Bearer {token}'
+    }
+    response = await default_client.get('/users/me/feed', headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {'items': [], 'next_cursor': None}
+
+async def test_feed_inactive_user(default_client: httpx.AsyncClient) -> None:
+    headers = {
+        'accept': 'application/json',
+        'authorization': f'Bearer {create_access_token("test", uuid.uuid4(), is_active=False)}'
+    }
+    test_response = {
+        'detail': 'User is inactive'
+    }
+    response = await default_client.get('/users/me/feed', headers=headers)
+    assert response.status_code == 403
+    assert response.json() == test_response